@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Benchmark warehouse queries on synthetic star-schema data at scaled fact-table sizes.
+Every (variant, size) run builds init/schema.sql in its own PostgreSQL schema, fills it,
+times the report queries and stores latency percentiles and EXPLAIN ANALYZE plans.
+"""
+
+import argparse
+import csv
+import math
+import os
+import re
+import time
+
+from extract_risk_disease import PG_CONFIG, FACT_TABLES, POPULATION_TABLE, report_query
+
+SCHEMA_SQL = 'init/schema.sql'
+VERIFY_SQL = 'verify_2013_2023.sql'
+RESULTS_DIR = os.getenv('BENCHMARK_DIR', 'benchmark_results')
+
+# Fact rows per country: sexes × age groups × years seeded by init/schema.sql
+CELLS_PER_COUNTRY = 3 * 5 * 11
+
+# Start of the views in init/schema.sql; 'schema' variant SQL runs before it (fact tables exist, nothing depends on them yet)
+SCHEMA_VIEWS_MARKER = '-- VIEWS - ATTRIBUTABLE DEATHS'
+
+# Hash partitions per fact table of the partition_by_country variant
+COUNTRY_PARTITIONS = 8
+
+# Schema variants ({table} = each fact table): 'schema' SQL replaces fact DDL before the fill,
+# 'data' SQL runs on the filled tables
+VARIANTS = {
+    'baseline': {'schema': [], 'data': []},
+    'country_year_index': {'schema': [], 'data': [
+        "CREATE INDEX ON {table} (country_id, year_id)",
+    ]},
+    'covering_index': {'schema': [], 'data': [
+        "CREATE INDEX ON {table} (load_generation_id, country_id, year_id) INCLUDE (sex_id, age_group_id, attributable_deaths)",
+    ]},
+    'partition_by_country': {'schema': [
+        "ALTER TABLE {table} RENAME TO {table}_heap",
+        "CREATE TABLE {table} (LIKE {table}_heap INCLUDING DEFAULTS, "
+        "PRIMARY KEY (fact_id, country_id), UNIQUE (load_generation_id, country_id, sex_id, age_group_id, year_id)) "
+        "PARTITION BY HASH (country_id)",
+        "ALTER SEQUENCE {table}_fact_id_seq OWNED BY {table}.fact_id",
+        "DROP TABLE {table}_heap",
+    ] + [
+        f"CREATE TABLE {{table}}_p{i} PARTITION OF {{table}} FOR VALUES WITH (MODULUS {COUNTRY_PARTITIONS}, REMAINDER {i})"
+        for i in range(COUNTRY_PARTITIONS)
+    ], 'data': []},
+}
+
+# Section headers of a --variant-file; SQL before any header belongs to 'data'
+VARIANT_FILE_SECTION = re.compile(r'^--\s*phase:\s*(schema|data)\s*$', re.MULTILINE | re.IGNORECASE)
+
+# Slice/rollup workload next to the two report queries
+QUERIES = {
+    'slice_country_year': """
+        SELECT f.sex_id, f.age_group_id, f.lung_cancer_deaths, f.attributable_deaths
+        FROM v_smoking_lung_cancer f
+        JOIN dim_country c ON c.country_id = f.country_id
+        JOIN dim_year y ON y.year_id = f.year_id
+        WHERE f.is_default AND c.country_code = 'DEU' AND y.year = 2020
+    """,
+    'rollup_country_sex': """
+        SELECT f.country_id, f.sex_id, SUM(f.cvd_deaths), SUM(f.attributable_deaths)
+        FROM v_bmi_cardiovascular f
+        JOIN dim_age_group a ON a.age_group_id = f.age_group_id
+        WHERE f.is_default AND a.age_group_code <> 'ALL'
+        GROUP BY ROLLUP (f.country_id, f.sex_id)
+    """,
+    'cube_year_age': """
+        SELECT y.year, a.age_group_code, SUM(f.cirrhosis_deaths), SUM(f.attributable_deaths)
+        FROM v_alcohol_cirrhosis f
+        JOIN dim_year y ON y.year_id = f.year_id
+        JOIN dim_age_group a ON a.age_group_id = f.age_group_id
+        WHERE f.is_default
+        GROUP BY CUBE (y.year, a.age_group_code)
+    """,
+    'top_age_standardized_rates': """
+        SELECT r.country_id, r.year_id, r.death_rate_std, r.attributable_rate_std
+        FROM mv_age_standardized_rates r
+        JOIN dim_af_scenario s ON s.scenario_id = r.scenario_id AND s.is_default
+        WHERE r.fact_name = 'smoking_lung_cancer' AND r.sex_id = 1
+        ORDER BY r.death_rate_std DESC
+        LIMIT 20
+    """,
+}
+
+def read_report_queries():
+    """The report query of run_etl.sh (extract_risk_disease.py report) and verify_2013_2023.sql, as benchmarked."""
+    with open(VERIFY_SQL, 'r', encoding='utf-8') as f:
+        verify = f.read()
+    return {'report_run_etl': report_query(), 'verify_2013_2023': verify.strip().rstrip(';')}
+
+def read_variant_file(path):
+    """Read a variant SQL file into {'schema': [...], 'data': [...]} by its '-- phase:' sections."""
+    with open(path, 'r', encoding='utf-8') as f:
+        parts = VARIANT_FILE_SECTION.split(f.read())
+    variant = {'schema': [], 'data': [parts[0]]}
+    for phase, sql in zip(parts[1::2], parts[2::2]):
+        variant[phase.lower()].append(sql)
+    return {phase: [sql for sql in statements if sql.strip()] for phase, statements in variant.items()}
+
+def create_benchmark_schema(cursor, schema, schema_statements=()):
+    """Create init/schema.sql inside a dedicated schema and make it the search path.
+
+    schema_statements run between the tables and the views, so a variant can replace the
+    fact table DDL (e.g. partitioning) before the views and rate views are built on it.
+    """
+    cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+    cursor.execute(f"CREATE SCHEMA {schema}")
+    cursor.execute(f"SET search_path TO {schema}")
+    with open(SCHEMA_SQL, 'r', encoding='utf-8') as f:
+        schema_sql = f.read()
+    # Split at the start of the separator line above the views header
+    split = schema_sql.rindex('\n', 0, schema_sql.rindex('\n', 0, schema_sql.index(SCHEMA_VIEWS_MARKER))) + 1
+    cursor.execute(schema_sql[:split])
+    apply_variant(cursor, schema_statements)
+    cursor.execute(schema_sql[split:])
+
+def fill_synthetic_data(cursor, target_rows, seed=0.42):
+    """Fill dimensions, one published load generation, the fact tables and population.
+
+    Synthetic countries are added until every fact table has at least target_rows rows.
+    Every other synthetic country gets BASELINE AF assumptions (and NULL attributable deaths),
+    like DEU/SWE next to USA/CHE. Returns the number of rows per fact table.
+    """
+    cursor.execute("SELECT setseed(%s)", (seed,))
+    # Synthetic codes ('SYN1', ...) do not fit the 3-letter ISO column, so no real country matches 'SYN%'
+    cursor.execute("ALTER TABLE dim_country ALTER COLUMN country_code TYPE VARCHAR(10)")
+
+    synthetic = max(0, math.ceil(target_rows / CELLS_PER_COUNTRY) - 4)
+    cursor.execute(
+        "INSERT INTO dim_country (country_code, country_name) "
+        "SELECT 'SYN' || g, 'Synthetic ' || g FROM generate_series(1, %s) g",
+        (synthetic,)
+    )
+    cursor.execute("INSERT INTO etl_load_generation (status, is_current, published_at) "
+                   "VALUES ('published', TRUE, now()) RETURNING generation_id")
+    generation_id = cursor.fetchone()[0]
+
+    for key, (fact_table, deaths_column) in FACT_TABLES.items():
+        cursor.execute(
+            "INSERT INTO af_assumption (scenario_id, fact_name, country_id, af, af_lower, af_upper) "
+            "SELECT s.scenario_id, %s, c.country_id, 0.5, 0.45, 0.55 "
+            "FROM dim_country c CROSS JOIN dim_af_scenario s "
+            "WHERE c.country_code LIKE 'SYN%%' AND c.country_id %% 2 = 0 AND s.scenario_code = 'BASELINE'",
+            (key,)
+        )
+        cursor.execute(f"""
+            INSERT INTO {fact_table} (country_id, sex_id, age_group_id, year_id,
+                {deaths_column}, attributable_deaths, {deaths_column}_lower, {deaths_column}_upper,
+                attributable_deaths_lower, attributable_deaths_upper, load_generation_id)
+            SELECT country_id, sex_id, age_group_id, year_id,
+                   deaths, attributable, deaths * 0.9, deaths * 1.1,
+                   attributable * 0.8, attributable * 1.2, %s
+            FROM (
+                SELECT c.country_id, s.sex_id, a.age_group_id, y.year_id,
+                       round((random() * 5000)::numeric, 2) AS deaths,
+                       CASE WHEN c.country_id %% 2 = 0 AND c.country_code LIKE 'SYN%%' THEN NULL
+                            ELSE round((random() * 1500)::numeric, 2) END AS attributable
+                FROM dim_country c CROSS JOIN dim_sex s CROSS JOIN dim_age_group a CROSS JOIN dim_year y
+            ) cells
+        """, (generation_id,))
+
+    cursor.execute(f"""
+        INSERT INTO {POPULATION_TABLE} (country_id, sex_id, age_group_id, year_id, population, load_generation_id)
+        SELECT c.country_id, s.sex_id, a.age_group_id, y.year_id,
+               round((random() * 5000000)::numeric) + 1, %s
+        FROM dim_country c CROSS JOIN dim_sex s CROSS JOIN dim_age_group a CROSS JOIN dim_year y
+    """, (generation_id,))
+
+    cursor.execute(f"SELECT COUNT(*) FROM {next(iter(FACT_TABLES.values()))[0]}")
+    return cursor.fetchone()[0]
+
+def apply_variant(cursor, statements):
+    """Run the variant SQL for every fact table (statements without {table} run once).
+
+    Only {table} is substituted, other braces (array literals, JSON) are left as they are.
+    """
+    for statement in statements:
+        if '{table}' in statement:
+            for fact_table, _ in FACT_TABLES.values():
+                cursor.execute(statement.replace('{table}', fact_table))
+        else:
+            cursor.execute(statement)
+
+def timed(cursor, sql, params=None):
+    """Execute sql, fetch all rows and return the elapsed milliseconds."""
+    start = time.perf_counter()
+    cursor.execute(sql, params)
+    cursor.fetchall()
+    return (time.perf_counter() - start) * 1000
+
+def latency_stats(samples):
+    """Latency percentiles (ms) of repeated runs."""
+    import numpy as np
+
+    values = np.asarray(samples)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {'runs': len(values), 'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99,
+            'mean_ms': values.mean(), 'min_ms': values.min(), 'max_ms': values.max()}
+
+def benchmark_queries(cursor, queries, repeat, warmup, plan_dir):
+    """Time every query repeat times after warmup runs and save its EXPLAIN ANALYZE plan."""
+    os.makedirs(plan_dir, exist_ok=True)
+    results = {}
+    for name, sql in queries.items():
+        for _ in range(warmup):
+            timed(cursor, sql)
+        results[name] = latency_stats([timed(cursor, sql) for _ in range(repeat)])
+
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")
+        with open(os.path.join(plan_dir, f'{name}.txt'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(row[0] for row in cursor.fetchall()) + '\n')
+        stats = results[name]
+        print(f"    {name}: p50={stats['p50_ms']:.1f} ms, p95={stats['p95_ms']:.1f} ms, p99={stats['p99_ms']:.1f} ms")
+    return results
+
+def run_benchmark(conn, variant, phases, target_rows, queries, args):
+    """Build, fill and benchmark one (variant, size) schema; returns (setup timings, query results)."""
+    schema = re.sub(r'\W', '_', f"bench_{variant}_{target_rows}").lower()
+    cursor = conn.cursor()
+    setup = {}
+    try:
+        start = time.perf_counter()
+        create_benchmark_schema(cursor, schema, phases['schema'])
+        fact_rows = fill_synthetic_data(cursor, target_rows)
+        setup['fill_s'] = time.perf_counter() - start
+        print(f"    Filled {schema}: {fact_rows} rows per fact table ({setup['fill_s']:.1f} s)")
+
+        start = time.perf_counter()
+        apply_variant(cursor, phases['data'])
+        cursor.execute("ANALYZE")
+        setup['variant_s'] = time.perf_counter() - start
+
+        # Same work as publish_load_generation()
+        start = time.perf_counter()
+        cursor.execute("REFRESH MATERIALIZED VIEW mv_death_rates")
+        cursor.execute("REFRESH MATERIALIZED VIEW mv_age_standardized_rates")
+        setup['refresh_rates_s'] = time.perf_counter() - start
+        conn.commit()
+
+        plan_dir = os.path.join(args.output, variant, str(target_rows))
+        results = benchmark_queries(cursor, queries, args.repeat, args.warmup, plan_dir)
+        setup['fact_rows'] = fact_rows
+        return setup, results
+    finally:
+        conn.rollback()
+        if not args.keep:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+            conn.commit()
+        cursor.close()
+
+def write_csv(path, fieldnames, rows):
+    """Write benchmark rows as CSV."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark warehouse queries at scaled fact-table sizes.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10**5, 10**6],
+                        help="fact rows per fact table, one benchmark per size (e.g. 100000 1000000 100000000)")
+    parser.add_argument('--variant', nargs='+', default=['baseline'],
+                        help=f"built-in schema variants: {', '.join(VARIANTS)}")
+    parser.add_argument('--variant-file', nargs='*', default=[],
+                        help="extra variants as SQL files (variant name = file name); SQL under a "
+                             "'-- phase: schema' line replaces fact DDL before the fill, the rest runs after it")
+    parser.add_argument('--repeat', type=int, default=20, help="timed runs per query")
+    parser.add_argument('--warmup', type=int, default=2, help="untimed runs per query before timing")
+    parser.add_argument('--output', default=RESULTS_DIR, help="directory for summary CSVs and EXPLAIN plans")
+    parser.add_argument('--keep', action='store_true', help="keep the bench_* schemas for manual inspection")
+    args = parser.parse_args(argv)
+
+    variants = {}
+    for name in args.variant:
+        if name not in VARIANTS:
+            parser.error(f"unknown variant {name!r} (choose from {', '.join(VARIANTS)})")
+        variants[name] = VARIANTS[name]
+    for path in args.variant_file:
+        variants[os.path.splitext(os.path.basename(path))[0]] = read_variant_file(path)
+
+    queries = dict(read_report_queries(), **QUERIES)
+    os.makedirs(args.output, exist_ok=True)
+
+    print("="*80)
+    print(f"WAREHOUSE BENCHMARK: {len(variants)} variants × {len(args.rows)} sizes × {len(queries)} queries")
+    print("="*80)
+
+    import psycopg2
+    conn = psycopg2.connect(**PG_CONFIG)
+    setup_rows, query_rows = [], []
+    try:
+        for variant, phases in variants.items():
+            for target_rows in args.rows:
+                print(f"\n[{variant}] {target_rows} fact rows per table")
+                setup, results = run_benchmark(conn, variant, phases, target_rows, queries, args)
+                setup_rows.append(dict(variant=variant, target_rows=target_rows, **setup))
+                query_rows.extend(dict(variant=variant, target_rows=target_rows, fact_rows=setup['fact_rows'],
+                                       query=name, **stats)
+                                  for name, stats in results.items())
+    finally:
+        conn.close()
+        write_csv(os.path.join(args.output, 'setup.csv'),
+                  ['variant', 'target_rows', 'fact_rows', 'fill_s', 'variant_s', 'refresh_rates_s'], setup_rows)
+        write_csv(os.path.join(args.output, 'summary.csv'),
+                  ['variant', 'target_rows', 'fact_rows', 'query', 'runs',
+                   'p50_ms', 'p95_ms', 'p99_ms', 'mean_ms', 'min_ms', 'max_ms'], query_rows)
+
+    print("\n" + "="*80)
+    print(f"✅ Results in {args.output}/summary.csv, EXPLAIN ANALYZE plans in {args.output}/<variant>/<rows>/")
+    print("="*80)
+
+if __name__ == '__main__':
+    main()
@@ -4,10 +4,17 @@ Extract RISK→DISEASE relationships from all 4 countries into PostgreSQL star s
 Each of the 4 fact tables contains data from ALL 4 countries.
 """
 
-import psycopg2
+import argparse
+import glob
+import io
+import json
+import mmap
 import re
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache, partial
+from multiprocessing import resource_tracker, shared_memory
 
 # Database connections - use environment variables for Docker compatibility
 PG_CONFIG = {
@@ -25,27 +32,31 @@ SQL_FILES = {
     'USA': 'databazy_ine_krajiny/usa.sql',  # USA
 }
 
-# Age group mappings
-AGE_MAPPINGS = {
-    'DEU': {'1': '0-14', '2': '15-49', '3': '50-69', '4': '70+', '5': 'ALL'},
-    'SWE': {'1': '0-14', '2': '15-49', '3': '50-69', '4': '70+', '5': 'ALL'},
-    # USA has detailed age groups - map them to WHO standard groups
-    'USA': {
-        '1': '0-14',   # <5 years
-        '23': '0-14',  # 5-14 years
-        '8': '15-49',  # 15-19 years
-        '9': '15-49',  # 20-24 years
-        '10': '15-49', # 25-29 years
-        '11': '15-49', # 30-34 years
-        '12': '15-49', # 35-39 years
-        '13': '15-49', # 40-44 years
-        '14': '15-49', # 45-49 years
-        '25': '50-69', # 50-69 years
-        '19': '70+',   # 70-74 years
-        '20': '70+',   # 75-79 years
-        '21': '70+',   # 80+ years
-    },
-    'CHE': {'1': '0-14', '2': '15-49', '3': '50-69', '4': '70+', '5': 'ALL'},
+# Target age bands (mirrors dim_age_group); age_to None = open-ended
+TARGET_AGE_BANDS = [
+    ('0-14', 0, 14),
+    ('15-49', 15, 49),
+    ('50-69', 50, 69),
+    ('70+', 70, None),
+]
+# Upper age used to close open-ended intervals (e.g. '80+ years') when splitting bands
+MAX_AGE = 100
+
+# GBD age_id → age label (USA fact_disease / fact_disease_risk)
+GBD_AGE_LABELS = {
+    '1': '<5 years',
+    '23': '5-14 years',
+    '8': '15-19 years',
+    '9': '20-24 years',
+    '10': '25-29 years',
+    '11': '30-34 years',
+    '12': '35-39 years',
+    '13': '40-44 years',
+    '14': '45-49 years',
+    '25': '50-69 years',
+    '19': '70-74 years',
+    '20': '75-79 years',
+    '21': '80+ years',
 }
 
 # Sex mappings - use single letter codes to match dim_sex
@@ -56,11 +67,271 @@ SEX_MAPPINGS = {
     'CHE': {'1': 'M', '2': 'F', '3': 'B'},
 }
 
-def get_dimension_id(cursor, table, code_column, code_value):
-    """Get dimension ID from code."""
-    cursor.execute(f"SELECT {table.replace('dim_', '')}_id FROM {table} WHERE {code_column} = %s", (code_value,))
-    result = cursor.fetchone()
-    return result[0] if result else None
+# USA cause_ids of the risk→cause pairs (see aggregate_usa_risk_rows); other causes are dropped in the parse workers
+USA_CAUSE_IDS = {'426', '493', '498', '509', '322', '521'}
+
+# Source countries in load order: (country code, name, extraction approach)
+SOURCES = [
+    ('USA', 'USA', 'Direct risk→disease attribution'),
+    ('DEU', 'Germany', 'Correlation approach'),
+    ('SWE', 'Sweden', 'Health registry data'),
+    ('CHE', 'Switzerland', 'IHME GBD CSV files'),
+]
+
+# Fact tables: data key -> (table name, total deaths column)
+FACT_TABLES = {
+    'smoking_lung_cancer': ('fact_smoking_lung_cancer', 'lung_cancer_deaths'),
+    'bmi_cardiovascular': ('fact_bmi_cardiovascular', 'cvd_deaths'),
+    'pollution_respiratory': ('fact_pollution_respiratory', 'respiratory_deaths'),
+    'alcohol_cirrhosis': ('fact_alcohol_cirrhosis', 'cirrhosis_deaths'),
+}
+
+# Report column labels per fact (total_<label>, attr_<label>)
+REPORT_LABELS = {
+    'smoking_lung_cancer': 'lc',
+    'bmi_cardiovascular': 'cvd',
+    'pollution_respiratory': 'resp',
+    'alcohol_cirrhosis': 'cirr',
+}
+
+# Population by (country, sex, age band, year): data key 'population' -> fact_population
+POPULATION_TABLE = 'fact_population'
+
+# Intra-file parallel parsing: worker processes and minimum bytes per range
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', str(os.cpu_count() or 1)))
+PARSE_MIN_RANGE_BYTES = 4 * 1024 * 1024
+# Parsed columns come back from workers in shared-memory blocks (JSON header + aligned arrays)
+SHARED_BLOCK_ALIGN = 64
+
+# Rows per committed load chunk (one checkpoint per chunk)
+LOAD_CHUNK_ROWS = int(os.getenv('LOAD_CHUNK_ROWS', '5000'))
+
+# Concurrent loading: one pooled connection per fact table (plus population)
+LOAD_CONNECTIONS = int(os.getenv('LOAD_CONNECTIONS', str(len(FACT_TABLES) + 1)))
+
+# Pre-load validation: slack for attributable <= total (values are stored as NUMERIC(15, 2))
+VALIDATION_TOLERANCE = 0.005
+
+# Dimension codes seeded by init/schema.sql; extract/validate check against these without a warehouse
+DIMENSION_CODES = {
+    'country': [code for code, _, _ in SOURCES],
+    'sex': ['M', 'F', 'B'],
+    'age': ['0-14', '15-49', '50-69', '70+', 'ALL'],
+    'year': list(range(2013, 2024)),
+}
+DIMENSION_REJECT_REASONS = {'unknown_country', 'unknown_sex', 'unknown_age_group', 'year_out_of_range'}
+
+# Columnar staging of harmonized facts: STAGING_DIR/source=<code>/fact=<key>/facts.<arrow|parquet>
+# (population: STAGING_DIR/source=<code>/population.<arrow|parquet>)
+STAGING_DIR = os.getenv('STAGING_DIR', 'staging')
+STAGING_FORMAT = os.getenv('STAGING_FORMAT', 'arrow')  # 'arrow' (IPC, zero-copy mmap) or 'parquet'
+STAGING_COLUMNS = [
+    'country_code', 'sex_code', 'age_group_code', 'year', 'deaths', 'attributable_deaths',
+    'deaths_lower', 'deaths_upper', 'attributable_deaths_lower', 'attributable_deaths_upper',
+]
+POPULATION_STAGING_COLUMNS = ['country_code', 'sex_code', 'age_group_code', 'year', 'population']
+
+# Monte Carlo uncertainty propagation (95% uncertainty intervals)
+UNCERTAINTY_SAMPLES = int(os.getenv('UNCERTAINTY_SAMPLES', '2000'))
+UNCERTAINTY_SEED = int(os.getenv('UNCERTAINTY_SEED', '2023'))
+UNCERTAINTY_PERCENTILES = (2.5, 97.5)
+# Max number of sampled values held in memory at once (components x samples)
+UNCERTAINTY_BATCH_VALUES = 10_000_000
+
+def parse_number(value, default=0.0):
+    """Convert a parsed SQL/CSV value to float, treating NULL and empty values as default."""
+    if value is None or value == '' or value == 'NULL':
+        return default
+    return float(value)
+
+def parse_age_interval(label):
+    """Parse an age label ('15-19 years', '<5 years', '80+ years', 'All ages') into (age_from, age_to).
+
+    Returns 'ALL' for all-ages labels and None when the label is not understood; age_to is None
+    for open-ended intervals.
+    """
+    text = str(label).strip().lower()
+    if 'all ages' in text or text in ('all', 'total'):
+        return 'ALL'
+    match = re.match(r'(\d+)\s*(?:-|–|to)\s*(\d+)', text)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    match = re.match(r'(?:<|under)\s*(\d+)', text)
+    if match:
+        return 0, int(match.group(1)) - 1
+    match = re.match(r'(\d+)\s*(?:\+|plus|years and over|and over)', text)
+    if match:
+        return int(match.group(1)), None
+    return None
+
+def population_in_ages(age_from, age_to, population):
+    """Population between age_from and age_to, assuming uniform ages inside each population interval."""
+    total = 0.0
+    for (pop_from, pop_to), count in population.items():
+        pop_to = MAX_AGE if pop_to is None else pop_to
+        overlap = min(age_to, pop_to) - max(age_from, pop_from) + 1
+        if overlap > 0:
+            total += count * overlap / (pop_to - pop_from + 1)
+    return total
+
+def build_age_index(labels, population=None):
+    """Build the age harmonization index of one source: label → [(age_group_code, weight), ...].
+
+    Labels inside one TARGET_AGE_BANDS band map with weight 1. Labels straddling band
+    boundaries are split by population, given as {(age_from, age_to): count} at a finer
+    resolution (see population_age_profile) or as a function returning it, called only once
+    a straddling label shows up. Without population, or when it does not cover every band of
+    the label, the split follows the years covered. Labels that cannot be parsed are left
+    out (their rows are dropped).
+
+    >>> build_age_index(['45-54 years'], {(45, 49): 300, (50, 54): 100})['45-54 years']
+    [('15-49', 0.75), ('50-69', 0.25)]
+    >>> build_age_index(['45-54 years'])['45-54 years']
+    [('15-49', 0.5), ('50-69', 0.5)]
+    >>> build_age_index(['10-19 years'], {(15, 19): 1000, (20, 24): 900})['10-19 years']
+    [('0-14', 0.5), ('15-49', 0.5)]
+    """
+    index = {}
+    for label in labels:
+        interval = parse_age_interval(label)
+        if interval is None:
+            continue
+        if interval == 'ALL':
+            index[label] = [('ALL', 1.0)]
+            continue
+        
+        age_from, age_to = interval
+        age_to = MAX_AGE if age_to is None else age_to
+        overlaps = []
+        for code, band_from, band_to in TARGET_AGE_BANDS:
+            band_to = MAX_AGE if band_to is None else band_to
+            low, high = max(age_from, band_from), min(age_to, band_to)
+            if low <= high:
+                overlaps.append((code, low, high))
+        
+        weights = []
+        if len(overlaps) > 1 and population:
+            if callable(population):
+                population = population()
+            weights = [(code, population_in_ages(low, high, population or {})) for code, low, high in overlaps]
+        # One unit per label: a band the population does not cover would get a share near zero
+        if not weights or not all(weight > 0 for _, weight in weights):
+            weights = [(code, float(high - low + 1)) for code, low, high in overlaps]
+        
+        total = sum(weight for _, weight in weights)
+        if total > 0:
+            index[label] = [(code, weight / total) for code, weight in weights]
+    return index
+
+def map_germany_sex(sex_text):
+    """Map Germany sex text to code."""
+    sex_text = sex_text.upper()
+    if 'MALE' in sex_text and 'FEMALE' not in sex_text:
+        return 'M'
+    elif 'FEMALE' in sex_text:
+        return 'F'
+    else:
+        return 'B'
+
+def finest_age_labels(labels):
+    """Age labels that do not contain another of the labels ('0-14' next to '0-4' is left out).
+
+    All-ages and unparseable labels are left out too. Summing over the finest labels only
+    keeps a population from being counted twice when a dump has overlapping age groups.
+    """
+    intervals = {}
+    for label in labels:
+        interval = parse_age_interval(label)
+        if interval not in (None, 'ALL'):
+            intervals[label] = (interval[0], MAX_AGE if interval[1] is None else interval[1])
+    
+    def contains(outer, inner):
+        return outer != inner and outer[0] <= inner[0] and inner[1] <= outer[1]
+    
+    return {label for label, interval in intervals.items()
+            if not any(contains(interval, other) for other in intervals.values())}
+
+def population_age_profile(population_rows):
+    """Germany population rows (country, sex, age, year, count) → {(age_from, age_to): count}.
+
+    Sums males and females over 2013-2023 of the finest age labels (see finest_age_labels).
+    """
+    rows = [row for row in population_rows
+            if len(row) >= 5 and str(row[3]).isdigit() and 2013 <= int(row[3]) <= 2023
+            and map_germany_sex(row[1]) in ('M', 'F')]
+    finest = finest_age_labels({row[2] for row in rows})
+    profile = {}
+    for row in rows:
+        if row[2] in finest:
+            interval = parse_age_interval(row[2])
+            profile[interval] = profile.get(interval, 0.0) + parse_number(row[4])
+    return profile
+
+@lru_cache(maxsize=None)
+def germany_population_profile():
+    """Age profile of Germany's `population` table, the split weights for straddling labels of every source.
+
+    Returns None when the Germany dump is not available (splits then follow the years covered).
+    """
+    if not os.path.exists(SQL_FILES['DEU']):
+        return None
+    with open(SQL_FILES['DEU'], 'r', encoding='utf-8', errors='ignore') as f:
+        return population_age_profile(parse_sql_inserts(f.read(), 'population')) or None
+
+def harmonize_age_frame(df, age_column, age_index, value_columns):
+    """Remap source age labels of a DataFrame to target bands in one vectorized join.
+
+    Adds an 'age_group' column. Rows of straddling labels are repeated per target band with
+    value_columns scaled by the band weight; rows with unmapped labels are dropped.
+    """
+    import pandas as pd
+    
+    pairs = pd.DataFrame(
+        [(label, code, weight) for label, targets in age_index.items() for code, weight in targets],
+        columns=[age_column, 'age_group', 'age_weight']
+    )
+    df = df.merge(pairs, on=age_column, how='inner')
+    for column in value_columns:
+        df[column] = df[column] * df['age_weight']
+    return df.drop(columns='age_weight')
+
+def population_by_band(country_code, df):
+    """Aggregate harmonized population (sex_code, age_group, year, population) into fact_population rows.
+
+    'ALL' ages is the source's own all-ages total, or the sum of the bands where the source has
+    no total (bands may not cover every age), and 'B' is the sum of 'M' and 'F' where both are
+    known, so fact cells find their population.
+    """
+    import pandas as pd
+    
+    df = df[df['sex_code'].isin(['M', 'F'])]
+    keys = ['sex_code', 'age_group', 'year']
+    bands = df[df['age_group'] != 'ALL'].groupby(keys, as_index=False)['population'].sum()
+    source_all = df[df['age_group'] == 'ALL'].groupby(keys, as_index=False)['population'].sum()
+    band_all = bands.groupby(['sex_code', 'year'], as_index=False)['population'].sum().assign(age_group='ALL')
+    band_all = band_all.merge(source_all[['sex_code', 'year']], how='left', indicator=True)
+    band_all = band_all[band_all['_merge'] == 'left_only'].drop(columns='_merge')
+    
+    df = pd.concat([bands, source_all, band_all], ignore_index=True)
+    both = df.groupby(['age_group', 'year']).agg(population=('population', 'sum'), sexes=('sex_code', 'nunique'))
+    both = both[both['sexes'] == 2].drop(columns='sexes').reset_index().assign(sex_code='B')
+    df = pd.concat([df, both], ignore_index=True)
+    return [(country_code, sex, age, str(year), float(pop))
+            for sex, age, year, pop in df[keys + ['population']].itertuples(index=False, name=None)]
+
+def get_dimension_ids(cursor, table, code_column):
+    """Get all (codes, ids) of a dimension as two aligned pyarrow arrays."""
+    import pyarrow as pa
+    
+    cursor.execute(f"SELECT {code_column}, {table.replace('dim_', '')}_id FROM {table}")
+    rows = cursor.fetchall()
+    return pa.array([row[0] for row in rows]), pa.array([row[1] for row in rows], pa.int32())
+
+def load_dimension_ids(cursor):
+    """(codes, ids) of the dimensions referenced by the first four staged columns, in column order."""
+    return [get_dimension_ids(cursor, table, code_column)
+            for table, code_column in (('dim_country', 'country_code'), ('dim_sex', 'sex_code'),
+                                       ('dim_age_group', 'age_group_code'), ('dim_year', 'year'))]
 
 def parse_sql_inserts(sql_content, table_name):
     """Parse INSERT statements from SQL file (supports both MySQL and PostgreSQL format)."""
@@ -96,32 +367,231 @@ def parse_sql_inserts(sql_content, table_name):
     
     return all_rows
 
-def extract_usa_risk_disease(cursor, sql_content):
-    """Extract RISK→DISEASE data from USA by combining fact_disease and fact_disease_risk tables."""
-    print("  Extracting USA data from fact_disease (total deaths) and fact_disease_risk (attributable deaths)...")
-    
-    # USA has both total disease deaths and attributable deaths!
-    # fact_disease: Total deaths from disease (measure_id=1, Deaths)
-    # fact_disease_risk: Attributable deaths (deaths caused by risk factor)
-    
-    # Parse both tables
-    disease_rows = parse_sql_inserts(sql_content, 'fact_disease')
-    risk_rows = parse_sql_inserts(sql_content, 'fact_disease_risk')
-    print(f"    Parsed {len(disease_rows)} rows from fact_disease, {len(risk_rows)} rows from fact_disease_risk")
-    
-    data = {
-        'smoking_lung_cancer': [],
-        'bmi_cardiovascular': [],
-        'pollution_respiratory': [],
-        'alcohol_cirrhosis': []
+def split_sql_ranges(sql_path, n_ranges):
+    """Split a SQL dump into up to n_ranges byte ranges that each start at an INSERT statement."""
+    size = os.path.getsize(sql_path)
+    n_ranges = max(1, min(n_ranges, size // PARSE_MIN_RANGE_BYTES))
+    if n_ranges == 1:
+        return [(0, size)]
+    
+    statement_start = re.compile(rb'\n[ \t]*INSERT[ \t]+INTO', re.IGNORECASE)
+    boundaries = [0]
+    with open(sql_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for i in range(1, n_ranges):
+            match = statement_start.search(mm, max(boundaries[-1], size * i // n_ranges))
+            if not match:
+                break
+            boundaries.append(match.start() + 1)
+    boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+def parse_sql_range(sql_path, start, end, table_aggregates):
+    """Worker: parse one byte range of a SQL dump and pre-aggregate the rows of each table."""
+    with open(sql_path, 'rb') as f:
+        f.seek(start)
+        sql_content = f.read(end - start).decode('utf-8', errors='ignore')
+    return {table: aggregate(parse_sql_inserts(sql_content, table)) for table, aggregate in table_aggregates.items()}
+
+def aligned(size):
+    """Round size up to SHARED_BLOCK_ALIGN bytes."""
+    return -(-size // SHARED_BLOCK_ALIGN) * SHARED_BLOCK_ALIGN
+
+def write_shared_columns(columns, meta):
+    """Write NumPy columns into one shared-memory block and return the block name.
+
+    Layout: 8-byte header length, JSON header (meta plus name, dtype, length and offset of
+    every column), then the column data, each column aligned to SHARED_BLOCK_ALIGN.
+    The reader owns the block and unlinks it (see read_shared_columns).
+    """
+    import numpy as np
+    
+    columns = {name: np.ascontiguousarray(values) for name, values in columns.items()}
+    layout = []
+    offset = 0
+    for name, values in columns.items():
+        layout.append((name, values.dtype.str, len(values), offset))
+        offset += aligned(values.nbytes)
+    header = json.dumps(dict(meta, columns=layout)).encode('utf-8')
+    data_start = aligned(8 + len(header))
+    
+    shm = shared_memory.SharedMemory(create=True, size=data_start + offset)
+    try:
+        shm.buf[:8] = len(header).to_bytes(8, 'little')
+        shm.buf[8:8 + len(header)] = header
+        for name, dtype, length, column_offset in layout:
+            np.ndarray(length, dtype=dtype, buffer=shm.buf, offset=data_start + column_offset)[:] = columns[name]
+    except Exception:
+        shm.close()
+        shm.unlink()
+        raise
+    # Ownership passes to the reader; keep this process's tracker from unlinking the block on exit
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    shm.close()
+    return shm.name
+
+def read_shared_columns(name):
+    """Attach to a block written by write_shared_columns without copying or unpickling.
+
+    Returns (shm, meta, {column: ndarray view into the block}). The views must be dropped
+    before release_shared_block(shm).
+    """
+    import numpy as np
+    
+    shm = shared_memory.SharedMemory(name=name)
+    header_length = int.from_bytes(shm.buf[:8], 'little')
+    meta = json.loads(bytes(shm.buf[8:8 + header_length]))
+    data_start = aligned(8 + header_length)
+    columns = {column: np.ndarray(length, dtype=dtype, buffer=shm.buf, offset=data_start + offset)
+               for column, dtype, length, offset in meta.pop('columns')}
+    return shm, meta, columns
+
+def release_shared_block(shm):
+    """Detach from and remove a shared-memory block."""
+    shm.close()
+    shm.unlink()
+
+def parse_sql_range_shared(sql_path, start, end, table_aggregates):
+    """Worker: parse_sql_range, handing each table's columns back in a shared-memory block.
+
+    Returns {table: block name}; keys and row count travel in the block header.
+    """
+    blocks = {}
+    for table, (keys, columns, row_count) in parse_sql_range(sql_path, start, end, table_aggregates).items():
+        blocks[table] = write_shared_columns(columns, {'keys': keys, 'rows': row_count})
+    return blocks
+
+def merge_column_blocks(blocks):
+    """Merge (keys, columns, row_count) blocks in file order into one block with a common key list.
+
+    Each block's 'key' column indexes its own keys; it is remapped to the merged key list and
+    every column is written once into preallocated merged arrays.
+    """
+    import numpy as np
+    
+    key_ids = {}
+    total = sum(len(columns['key']) for _, columns, _ in blocks)
+    merged = {name: np.empty(total, dtype=values.dtype) for name, values in blocks[0][1].items()}
+    position = 0
+    for keys, columns, _ in blocks:
+        remap = np.array([key_ids.setdefault(tuple(key), len(key_ids)) for key in keys], dtype=np.int32)
+        count = len(columns['key'])
+        for name, values in columns.items():
+            merged[name][position:position + count] = remap[values] if name == 'key' else values
+        position += count
+    return list(key_ids), merged, sum(row_count for _, _, row_count in blocks)
+
+def unlink_shared_blocks(names):
+    """Remove shared-memory blocks by name, ignoring blocks that are already gone."""
+    for name in names:
+        try:
+            shm = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            continue
+        release_shared_block(shm)
+
+def take_shared_blocks(names):
+    """Copy worker blocks {table: block name} into process memory and unlink them right away.
+
+    Returns {table: (keys, columns, row_count)}. Every block in names is unlinked, also when
+    attaching fails partway.
+    """
+    blocks = {}
+    try:
+        for table, name in names.items():
+            shm, meta, columns = read_shared_columns(name)
+            try:
+                blocks[table] = (meta['keys'], {column: values.copy() for column, values in columns.items()}, meta['rows'])
+            finally:
+                columns.clear()
+                release_shared_block(shm)
+    finally:
+        unlink_shared_blocks([name for table, name in names.items() if table not in blocks])
+    return blocks
+
+def parse_sql_file_parallel(sql_path, table_aggregates, workers=PARSE_WORKERS):
+    """Parse INSERT rows of several tables from one SQL dump across worker processes.
+
+    table_aggregates maps table name -> aggregate(rows) returning (keys, columns, row_count):
+    NumPy columns with a 'key' column indexing keys (see component_columns). The dump is split
+    at INSERT boundaries, each worker tokenizes and pre-aggregates its range and hands the
+    columns back through shared memory. Each worker's blocks are copied out and unlinked as
+    soon as it finishes, so /dev/shm only holds blocks in flight; the copies are merged in
+    file order. If a worker fails, the blocks of the other workers are unlinked before the
+    error propagates. Returns {table: (keys, columns, row_count)}.
+    """
+    ranges = split_sql_ranges(sql_path, workers)
+    if len(ranges) == 1:
+        return parse_sql_range(sql_path, ranges[0][0], ranges[0][1], table_aggregates)
+    
+    print(f"    Parsing {os.path.basename(sql_path)} in {len(ranges)} ranges on {min(workers, len(ranges))} workers")
+    blocks = [None] * len(ranges)
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+        futures = {pool.submit(parse_sql_range_shared, sql_path, start, end, table_aggregates): i
+                   for i, (start, end) in enumerate(ranges)}
+        try:
+            for future in as_completed(futures):
+                blocks[futures[future]] = take_shared_blocks(future.result())
+        except BaseException:
+            # Stop queued ranges, wait for running ones and unlink whatever they handed back
+            for future in futures:
+                future.cancel()
+            for future in futures:
+                if not future.cancelled() and future.exception() is None:
+                    unlink_shared_blocks(future.result().values())
+            raise
+    return {table: merge_column_blocks([block[table] for block in blocks]) for table in table_aggregates}
+
+def component_columns(key_ids, keys, values, lowers, uppers):
+    """Pack per-row (key, value, lower, upper) components into (keys, columns) for parse workers."""
+    import numpy as np
+    
+    return list(key_ids), {
+        'key': np.array(keys, dtype=np.int32),
+        'value': np.array(values, dtype=np.float64),
+        'lower': np.array(lowers, dtype=np.float64),
+        'upper': np.array(uppers, dtype=np.float64),
     }
+
+def component_totals(keys, columns):
+    """Sum of 'value' per key of a component block: {key: total}."""
+    import numpy as np
     
+    sums = np.bincount(columns['key'], weights=columns['value'], minlength=len(keys))
+    return dict(zip(keys, sums.tolist()))
+
+def uncertainty_columns(cells, parts):
+    """Columnar uncertainty components of component blocks, as accepted by compute_uncertainty_bounds.
+
+    cells lists the (country, sex, age, year) fact cells. parts are (columns, key_cells, measure):
+    a component block (see component_columns), an array mapping each block key to a cell index
+    (-1 leaves the key out) and 'total' or 'attributable'. Rows stay NumPy arrays throughout.
+    """
+    import numpy as np
+    
+    picked = []
+    for columns, key_cells, measure in parts:
+        cell = key_cells[columns['key']]
+        used = cell >= 0
+        picked.append((cell[used], np.full(used.sum(), measure == 'attributable'),
+                       columns['value'][used], columns['lower'][used], columns['upper'][used]))
+    names = ('cell', 'attributable', 'value', 'lower', 'upper')
+    return dict({name: np.concatenate([part[i] for part in picked]) for i, name in enumerate(names)},
+                cells=list(cells))
+
+def aggregate_usa_disease_rows(rows, age_index):
+    """Pre-aggregate USA fact_disease rows into total death components by (cause_id, sex, age, year).
+
+    age_index maps GBD age_id → [(age_group_code, weight), ...] (see build_age_index).
+
+    Returns (keys, columns, row_count) as built by component_columns; runs inside parse workers.
+    """
     # Build total disease deaths dictionary from fact_disease
     # Columns: id, measure_id, sex_id, age_id, cause_id, metric_id, year, value, upper, lower, unit
     # measure_id 1 = Deaths, metric_id 1 = Number (not rate)
     # cause_id: 426=Lung cancer, 493=Ischemic heart, 509=COPD, 521=Cirrhosis
-    total_deaths_dict = {}
-    for row in disease_rows:
+    key_ids = {}
+    keys, values, lowers, uppers = [], [], [], []
+    for row in rows:
         if len(row) < 8:
             continue
         
@@ -132,26 +602,41 @@ def extract_usa_risk_disease(cursor, sql_content):
         metric_id = row[5]
         year = row[6]
         value = float(row[7]) if row[7] and row[7] != 'NULL' else 0
+        upper = parse_number(row[8], value) if len(row) > 8 else value
+        lower = parse_number(row[9], value) if len(row) > 9 else value
         
-        # Only deaths (measure_id = 1), metric_id = 1 (Number), years 2014-2023
-        if measure_id != '1' or metric_id != '1' or int(year) < 2014 or int(year) > 2023:
+        # Only deaths (measure_id = 1), metric_id = 1 (Number), years 2014-2023, causes of the risk→cause pairs
+        if measure_id != '1' or metric_id != '1' or int(year) < 2014 or int(year) > 2023 or cause_id not in USA_CAUSE_IDS:
             continue
         
         sex_code = SEX_MAPPINGS['USA'].get(sex_id)
-        age_code = AGE_MAPPINGS['USA'].get(age_id)
+        age_targets = age_index.get(age_id)
         
-        if not sex_code or not age_code:
+        if not sex_code or not age_targets:
             continue
         
         # Aggregate by (cause_id, sex, age, year)
-        key = (cause_id, sex_code, age_code, year)
-        total_deaths_dict[key] = total_deaths_dict.get(key, 0) + value
+        for age_code, weight in age_targets:
+            keys.append(key_ids.setdefault((cause_id, sex_code, age_code, year), len(key_ids)))
+            values.append(value * weight)
+            lowers.append(lower * weight)
+            uppers.append(upper * weight)
     
+    return component_columns(key_ids, keys, values, lowers, uppers) + (len(rows),)
+
+def aggregate_usa_risk_rows(rows, age_index):
+    """Pre-aggregate USA fact_disease_risk rows into attributable death components by (risk, sex, age, year, cause_id).
+
+    age_index maps GBD age_id → [(age_group_code, weight), ...] (see build_age_index).
+
+    Returns (keys, columns, row_count) as built by component_columns; runs inside parse workers.
+    """
     # Build attributable deaths dictionary from fact_disease_risk
     # Columns: id, measure_id, sex_id, age_id, cause_id, risk_id, metric_id, year, value, upper, lower, unit
     # risk_id: 99=Smoking, 102=High alcohol, 108=High BMI, 85=Air pollution
-    attributable_dict = {}
-    for row in risk_rows:
+    key_ids = {}
+    keys, values, lowers, uppers = [], [], [], []
+    for row in rows:
         if len(row) < 9:
             continue
         
@@ -163,30 +648,79 @@ def extract_usa_risk_disease(cursor, sql_content):
         metric_id = row[6]
         year = row[7]
         value = float(row[8]) if row[8] and row[8] != 'NULL' else 0
+        upper = parse_number(row[9], value) if len(row) > 9 else value
+        lower = parse_number(row[10], value) if len(row) > 10 else value
         
         # Only deaths (measure_id = 1), metric_id = 1 (Number), years 2014-2023
         if measure_id != '1' or metric_id != '1' or int(year) < 2014 or int(year) > 2023:
             continue
         
         sex_code = SEX_MAPPINGS['USA'].get(sex_id)
-        age_code = AGE_MAPPINGS['USA'].get(age_id)
+        age_targets = age_index.get(age_id)
         
-        if not sex_code or not age_code:
+        if not sex_code or not age_targets:
             continue
         
         # Filter by specific risk→cause pairs
         if risk_id == '99' and cause_id == '426':  # Smoking → Lung cancer
-            key = ('smoking', sex_code, age_code, year, '426')
-            attributable_dict[key] = attributable_dict.get(key, 0) + value
+            risk_type = 'smoking'
         elif risk_id == '108' and cause_id in ('493', '498'):  # High BMI → IHD + Stroke
-            key = ('bmi', sex_code, age_code, year, cause_id)
-            attributable_dict[key] = attributable_dict.get(key, 0) + value
+            risk_type = 'bmi'
         elif risk_id == '85' and cause_id in ('509', '322'):  # Air pollution → COPD + LRI
-            key = ('pollution', sex_code, age_code, year, cause_id)
-            attributable_dict[key] = attributable_dict.get(key, 0) + value
+            risk_type = 'pollution'
         elif risk_id == '102' and cause_id == '521':  # High alcohol → Cirrhosis
-            key = ('alcohol', sex_code, age_code, year, '521')
-            attributable_dict[key] = attributable_dict.get(key, 0) + value
+            risk_type = 'alcohol'
+        else:
+            continue
+        
+        for age_code, weight in age_targets:
+            keys.append(key_ids.setdefault((risk_type, sex_code, age_code, year, cause_id), len(key_ids)))
+            values.append(value * weight)
+            lowers.append(lower * weight)
+            uppers.append(upper * weight)
+    
+    return component_columns(key_ids, keys, values, lowers, uppers) + (len(rows),)
+
+def extract_usa_risk_disease(cursor, sql_path):
+    """Extract RISK→DISEASE data from USA by combining fact_disease and fact_disease_risk tables.
+
+    The dump is parsed and pre-aggregated in parallel byte ranges (see parse_sql_file_parallel).
+    """
+    import numpy as np
+    
+    print("  Extracting USA data from fact_disease (total deaths) and fact_disease_risk (attributable deaths)...")
+    
+    # USA has both total disease deaths and attributable deaths!
+    # fact_disease: Total deaths from disease (measure_id=1, Deaths)
+    # fact_disease_risk: Attributable deaths (deaths caused by risk factor)
+    
+    # Harmonization index built once: GBD age_id → target age bands (straddling ids split by population)
+    label_index = build_age_index(GBD_AGE_LABELS.values(), germany_population_profile)
+    age_index = {age_id: label_index[label] for age_id, label in GBD_AGE_LABELS.items() if label in label_index}
+    
+    # Parse and pre-aggregate both tables across worker processes (columns return via shared memory)
+    parsed = parse_sql_file_parallel(sql_path, {
+        'fact_disease': partial(aggregate_usa_disease_rows, age_index=age_index),
+        'fact_disease_risk': partial(aggregate_usa_risk_rows, age_index=age_index),
+    })
+    total_keys, total_columns, disease_count = parsed['fact_disease']
+    attributable_keys, attributable_columns, risk_count = parsed['fact_disease_risk']
+    total_deaths_dict = component_totals(total_keys, total_columns)
+    attributable_dict = component_totals(attributable_keys, attributable_columns)
+    print(f"    Parsed {disease_count} rows from fact_disease, {risk_count} rows from fact_disease_risk")
+    
+    data = {
+        'smoking_lung_cancer': [],
+        'bmi_cardiovascular': [],
+        'pollution_respiratory': [],
+        'alcohol_cirrhosis': []
+    }
+    risk_facts = {
+        'smoking': 'smoking_lung_cancer',
+        'bmi': 'bmi_cardiovascular',
+        'pollution': 'pollution_respiratory',
+        'alcohol': 'alcohol_cirrhosis',
+    }
     
     # Combine total + attributable deaths
     # Group by (risk_type, sex, age, year) for final output
@@ -235,14 +769,25 @@ def extract_usa_risk_disease(cursor, sql_content):
     # Convert to final format: (country, sex, age, year, disease_deaths, attributable_deaths)
     for key, values in combined.items():
         risk_type, country, sex, age, year = key
-        if risk_type == 'smoking':
-            data['smoking_lung_cancer'].append((country, sex, age, year, values['total'], values['attributable']))
-        elif risk_type == 'bmi':
-            data['bmi_cardiovascular'].append((country, sex, age, year, values['total'], values['attributable']))
-        elif risk_type == 'pollution':
-            data['pollution_respiratory'].append((country, sex, age, year, values['total'], values['attributable']))
-        elif risk_type == 'alcohol':
-            data['alcohol_cirrhosis'].append((country, sex, age, year, values['total'], values['attributable']))
+        fact = risk_facts[risk_type]
+        data[fact].append((country, sex, age, year, values['total'], values['attributable']))
+    
+    # Uncertainty components stay columnar: each parsed component is tagged with its fact cell
+    # (a total component once per risk whose attributable key refers to it)
+    total_index = {key: i for i, key in enumerate(total_keys)}
+    uncertainty = {}
+    for risk_type, fact in risk_facts.items():
+        cells = {}
+        attributable_cells = np.full(len(attributable_keys), -1, dtype=np.int64)
+        total_cells = np.full(len(total_keys), -1, dtype=np.int64)
+        for i, (risk, sex, age, year, cause_id) in enumerate(attributable_keys):
+            if risk != risk_type:
+                continue
+            attributable_cells[i] = cells.setdefault(('USA', sex, age, year), len(cells))
+            if (cause_id, sex, age, year) in total_index:
+                total_cells[total_index[(cause_id, sex, age, year)]] = attributable_cells[i]
+        uncertainty[fact] = uncertainty_columns(cells, [(total_columns, total_cells, 'total'),
+                                                        (attributable_columns, attributable_cells, 'attributable')])
     
     print(f"    Extracted: Smoking→LC={len(data['smoking_lung_cancer'])}, BMI→CVD={len(data['bmi_cardiovascular'])}, Pollution→Resp={len(data['pollution_respiratory'])}, Alcohol→Cirrhosis={len(data['alcohol_cirrhosis'])}")
     
@@ -251,7 +796,7 @@ def extract_usa_risk_disease(cursor, sql_content):
         sample_years = set([row[3] for row in data['smoking_lung_cancer'][:10]])
         print(f"    Sample years: {sorted(sample_years)}")
     
-    return data
+    return data, uncertainty
     
     # Debug: Show sample years
     if len(data['smoking_lung_cancer']) > 0:
@@ -264,34 +809,7 @@ def extract_germany_risk_disease(cursor, sql_content):
     """Extract RISK→DISEASE data from Germany by joining separate tables."""
     print("  Extracting Germany data from lm_* and dm_* tables...")
     
-    # Germany uses text age groups like "15-19 years", "20-24 years" etc
-    # Need to aggregate to WHO groups
-    def map_germany_age(age_text):
-        """Map Germany age text to WHO standard group."""
-        age_text = age_text.strip().upper()
-        # Parse numeric range (e.g., '15-19 years')
-        match = re.match(r'(\d+)-(\d+)', age_text)
-        if match:
-            start = int(match.group(1))
-            if start < 15:
-                return '0-14'
-            elif start < 50:
-                return '15-49'
-            elif start < 70:
-                return '50-69'
-            else:
-                return '70+'
-        return None
-    
-    def map_germany_sex(sex_text):
-        """Map Germany sex text to code."""
-        sex_text = sex_text.upper()
-        if 'MALE' in sex_text and 'FEMALE' not in sex_text:
-            return 'M'
-        elif 'FEMALE' in sex_text:
-            return 'F'
-        else:
-            return 'B'
+    # Germany SDR tables have no age breakdown - facts are stored for 'ALL' ages
     
     data = {
         'smoking_lung_cancer': [],
@@ -299,6 +817,8 @@ def extract_germany_risk_disease(cursor, sql_content):
         'pollution_respiratory': [],
         'alcohol_cirrhosis': []
     }
+    # SDR × population has no source 95% UI, so the bounds of these facts stay NULL
+    uncertainty = {key: [] for key in data}
     
     # Parse risk factor tables - format: country, sex, age_group, year, value
     tobacco_rows = parse_sql_inserts(sql_content, 'lm_tobaco')
@@ -319,15 +839,25 @@ def extract_germany_risk_disease(cursor, sql_content):
     print(f"    Diseases SDR: lung_cancer={len(lung_cancer_rows)}, ischemic={len(ischemic_heart_rows)}, respiratory={len(lower_respiratory_rows)}, liver={len(liver_disease_rows)}")
     print(f"    Population data: {len(population_rows)} rows")
     
-    # Build population dict by (sex, year) - sum across all age groups
-    population_dict = {}
-    for row in population_rows:
-        if len(row) >= 5:
-            country, sex_text, age_text, year, pop = row[0], row[1], row[2], row[3], float(row[4]) if row[4] != 'NULL' else 0
-            sex_code = map_germany_sex(sex_text)
-            if sex_code in ('M', 'F') and 2013 <= int(year) <= 2023:
-                key = (sex_code, year)
-                population_dict[key] = population_dict.get(key, 0) + pop
+    # Population by harmonized age band, loaded into fact_population for per-capita rates
+    import pandas as pd
+    population_df = pd.DataFrame(
+        [(map_germany_sex(row[1]), row[2], int(row[3]), parse_number(row[4]))
+         for row in population_rows if len(row) >= 5 and 2013 <= int(row[3]) <= 2023],
+        columns=['sex_code', 'age_text', 'year', 'population']
+    )
+    # Overlapping age groups ('0-14' next to '0-4') would be counted twice - keep the finest ones and all-ages totals
+    labels = set(population_df['age_text'])
+    labels = finest_age_labels(labels) | {label for label in labels if parse_age_interval(label) == 'ALL'}
+    age_index = build_age_index(labels, population_age_profile(population_rows))
+    population_df = harmonize_age_frame(population_df, 'age_text', age_index, ['population'])
+    data['population'] = population_by_band('DEU', population_df)
+    print(f"    Population by age band: {len(data['population'])} rows")
+    
+    # Population by (sex, year) for all ages - the same 'ALL' rows fact_population gets,
+    # so rates divide by the population the SDR was converted with
+    population_dict = {(sex, year): pop for _, sex, age, year, pop in data['population']
+                       if age == 'ALL' and sex in ('M', 'F')}
     
     # Aggregate tobacco by (sex, year) summing all age groups
     tobacco_dict = {}
@@ -360,11 +890,8 @@ def extract_germany_risk_disease(cursor, sql_content):
                 air_pollution_dict[key] = air_pollution_dict.get(key, 0) + value
 
     # Process SDR disease tables (format: country, sex, year, rate_per_100k)
-    # Apply attributable fractions (AF) to Germany like Sweden:
-    # - Smoking → LC: AF = 0.80 (RKI studies show ~80% of lung cancer attributable to smoking)
-    # - BMI → CVD: AF = 0.15 (epidemiological estimate for obesity contribution to CVD)
-    # - PM2.5 → Resp: AF = 0.20 (GBD 2019 shows ~20% respiratory deaths from air pollution)
-    # - Alcohol → Cirrhosis: AF = 0.48 (Global studies show ~48% of cirrhosis alcohol-attributable)
+    # Germany has no direct attribution - only total deaths are stored, attributable deaths
+    # are total × AF at query time (af_assumption, BASELINE: 0.80/0.15/0.20/0.48)
     
     # Smoking → Lung cancer
     lung_cancer_dict = {}
@@ -381,10 +908,8 @@ def extract_germany_risk_disease(cursor, sql_content):
 
     for key, deaths in lung_cancer_dict.items():
         sex_code, year = key
-        # Apply 80% attributable fraction for smoking→LC
-        attributable_deaths = deaths * 0.80
-        # Store total deaths in disease_deaths, AF-calculated in attributable_deaths
-        data['smoking_lung_cancer'].append(('DEU', sex_code, 'ALL', year, deaths, attributable_deaths))
+        # Attributable deaths = total × AF, derived in the warehouse from af_assumption
+        data['smoking_lung_cancer'].append(('DEU', sex_code, 'ALL', year, deaths, None))
     
     # High BMI → Ischemic heart
     ischemic_dict = {}
@@ -400,10 +925,8 @@ def extract_germany_risk_disease(cursor, sql_content):
 
     for key, deaths in ischemic_dict.items():
         sex_code, year = key
-        # Apply 15% attributable fraction for BMI→CVD
-        attributable_deaths = deaths * 0.15
-        # Store total CVD deaths, then AF-calculated attributable deaths
-        data['bmi_cardiovascular'].append(('DEU', sex_code, 'ALL', year, deaths, attributable_deaths))
+        # Attributable deaths = total × AF, derived in the warehouse from af_assumption
+        data['bmi_cardiovascular'].append(('DEU', sex_code, 'ALL', year, deaths, None))
     
     # Air pollution → Respiratory
     respiratory_dict = {}
@@ -419,10 +942,8 @@ def extract_germany_risk_disease(cursor, sql_content):
 
     for key, deaths in respiratory_dict.items():
         sex_code, year = key
-        # Apply 20% attributable fraction for pollution→respiratory
-        attributable_deaths = deaths * 0.20
-        # Store total respiratory deaths, then AF-calculated attributable deaths
-        data['pollution_respiratory'].append(('DEU', sex_code, 'ALL', year, deaths, attributable_deaths))
+        # Attributable deaths = total × AF, derived in the warehouse from af_assumption
+        data['pollution_respiratory'].append(('DEU', sex_code, 'ALL', year, deaths, None))
     
     # Alcohol → Liver disease
     liver_dict = {}
@@ -438,14 +959,12 @@ def extract_germany_risk_disease(cursor, sql_content):
     
     for key, deaths in liver_dict.items():
         sex_code, year = key
-        # Apply 48% attributable fraction for alcohol→cirrhosis (global studies)
-        attributable_deaths = deaths * 0.48
-        # Store total cirrhosis deaths, then AF-calculated attributable deaths
-        data['alcohol_cirrhosis'].append(('DEU', sex_code, 'ALL', year, deaths, attributable_deaths))
+        # Attributable deaths = total × AF, derived in the warehouse from af_assumption
+        data['alcohol_cirrhosis'].append(('DEU', sex_code, 'ALL', year, deaths, None))
     
     print(f"    Extracted Germany: Smoking→LC={len(data['smoking_lung_cancer'])}, BMI→CVD={len(data['bmi_cardiovascular'])}, Pollution→Resp={len(data['pollution_respiratory'])}, Alcohol→Cirrhosis={len(data['alcohol_cirrhosis'])}")
     
-    return data
+    return data, uncertainty
 
 def extract_sweden_risk_disease(cursor, sql_content):
     """Extract RISK→DISEASE data from Sweden by joining faktor_data and disease_data."""
@@ -478,6 +997,8 @@ def extract_sweden_risk_disease(cursor, sql_content):
         'pollution_respiratory': [],
         'alcohol_cirrhosis': []
     }
+    # Registry death counts have no source 95% UI, so the bounds of these facts stay NULL
+    uncertainty = {key: [] for key in data}
     
     # Parse disease_data - structure: id, year_id, disease_id, region_id, gender_id, total_cases, death_cases
     disease_rows = parse_sql_inserts(sql_content, 'disease_data')
@@ -529,11 +1050,7 @@ def extract_sweden_risk_disease(cursor, sql_content):
     
     # Join disease data with faktor data
     # NOTE: Sweden disease_data contains TOTAL deaths, not attributable deaths
-    # We apply attributable fractions (AF) based on epidemiological literature:
-    # - Smoking → LC: AF = 0.75 (70-80% of LC deaths attributable to smoking)
-    # - BMI → CVD: AF = 0.15 (10-20% of CVD attributable to obesity)
-    # - Pollution → Resp: AF = 0.20 (15-25% of resp deaths from air pollution)
-    # - Alcohol → Cirrhosis: AF = 0.55 (50-60% of cirrhosis from alcohol)
+    # Attributable deaths are total × AF at query time (af_assumption, BASELINE: 0.75/0.15/0.20/0.55)
     
     # Smoking (faktor=1) → Lung cancer (disease=12)
     for (year_id, gender_id, disease_id), deaths in disease_dict.items():
@@ -546,10 +1063,8 @@ def extract_sweden_risk_disease(cursor, sql_content):
         if not sex_code:
             continue
         
-        # Apply 75% attributable fraction for smoking→LC
-        attributable_deaths = deaths * 0.75
-        # Store total deaths in lung_cancer_deaths, AF-adjusted in attributable_deaths
-        data['smoking_lung_cancer'].append(('SWE', sex_code, 'ALL', year, deaths, attributable_deaths))
+        # Attributable deaths = total × AF, derived in the warehouse from af_assumption
+        data['smoking_lung_cancer'].append(('SWE', sex_code, 'ALL', year, deaths, None))
     
     # High BMI → Cardiovascular (disease=41, no direct BMI faktor - skip or use proxy)
     for (year_id, gender_id, disease_id), deaths in disease_dict.items():
@@ -562,10 +1077,8 @@ def extract_sweden_risk_disease(cursor, sql_content):
         if not sex_code:
             continue
         
-        # Apply 15% attributable fraction for BMI→CVD
-        attributable_deaths = deaths * 0.15
-        # Store total CVD deaths, then AF-adjusted attributable deaths
-        data['bmi_cardiovascular'].append(('SWE', sex_code, 'ALL', year, deaths, attributable_deaths))
+        # Attributable deaths = total × AF, derived in the warehouse from af_assumption
+        data['bmi_cardiovascular'].append(('SWE', sex_code, 'ALL', year, deaths, None))
     
     # Air pollution (faktor=3) → Respiratory (disease=52)
     for (year_id, gender_id, disease_id), deaths in disease_dict.items():
@@ -578,10 +1091,8 @@ def extract_sweden_risk_disease(cursor, sql_content):
         if not sex_code:
             continue
         
-        # Apply 20% attributable fraction for pollution→respiratory
-        attributable_deaths = deaths * 0.20
-        # Store total respiratory deaths, then AF-adjusted attributable deaths
-        data['pollution_respiratory'].append(('SWE', sex_code, 'ALL', year, deaths, attributable_deaths))
+        # Attributable deaths = total × AF, derived in the warehouse from af_assumption
+        data['pollution_respiratory'].append(('SWE', sex_code, 'ALL', year, deaths, None))
     
     # Alcohol (faktor=2) → Cirrhosis (disease=57)
     for (year_id, gender_id, disease_id), deaths in disease_dict.items():
@@ -594,14 +1105,12 @@ def extract_sweden_risk_disease(cursor, sql_content):
         if not sex_code:
             continue
         
-        # Apply 55% attributable fraction for alcohol→cirrhosis
-        attributable_deaths = deaths * 0.55
-        # Store total cirrhosis deaths, then AF-adjusted attributable deaths
-        data['alcohol_cirrhosis'].append(('SWE', sex_code, 'ALL', year, deaths, attributable_deaths))
+        # Attributable deaths = total × AF, derived in the warehouse from af_assumption
+        data['alcohol_cirrhosis'].append(('SWE', sex_code, 'ALL', year, deaths, None))
     
     print(f"    Extracted Sweden: Smoking→LC={len(data['smoking_lung_cancer'])}, BMI→CVD={len(data['bmi_cardiovascular'])}, Pollution→Resp={len(data['pollution_respiratory'])}, Alcohol→Cirrhosis={len(data['alcohol_cirrhosis'])}")
     
-    return data
+    return data, uncertainty
 
 def extract_switzerland_risk_disease(cursor):
     """Extract RISK→DISEASE data from Switzerland CSV files."""
@@ -620,7 +1129,7 @@ def extract_switzerland_risk_disease(cursor):
         df_total = pd.read_csv(total_csv)
     except FileNotFoundError as e:
         print(f"    ERROR: Switzerland CSV file not found: {e}")
-        return {}
+        return {}, {}
 
     # Filter for required data: Deaths, Number metric, years 2013-2023
     df_attributable = df_attributable[(df_attributable['measure_name'] == 'Deaths') & 
@@ -637,25 +1146,10 @@ def extract_switzerland_risk_disease(cursor):
 
     print(f"    Filtered: {len(df_attributable)} attributable rows, {len(df_total)} total rows")
 
-    # Map age groups
-    def map_swiss_age(age_name):
-        if age_name in ['<5 years', '5-14 years']:
-            return '0-14'
-        elif age_name in ['15-49 years', '15-19 years', '20-24 years', '25-29 years', '30-34 years', '35-39 years', '40-44 years', '45-49 years']:
-            return '15-49'
-        elif age_name in ['50-69 years']:
-            return '50-69'
-        elif age_name in ['70+ years', '70-74 years', '75-79 years', '80+ years']:
-            return '70+'
-        elif 'all ages' in age_name.lower():
-            return 'ALL'
-        return None
-
-    df_attributable['age_group'] = df_attributable['age_name'].apply(map_swiss_age)
-    df_attributable = df_attributable.dropna(subset=['age_group'])
-    
-    df_total['age_group'] = df_total['age_name'].apply(map_swiss_age)
-    df_total = df_total.dropna(subset=['age_group'])
+    # Harmonize IHME age labels to dim_age_group bands (one index for both files, straddling labels split by population)
+    age_index = build_age_index(set(df_attributable['age_name']) | set(df_total['age_name']), germany_population_profile)
+    df_attributable = harmonize_age_frame(df_attributable, 'age_name', age_index, ['val', 'upper', 'lower'])
+    df_total = harmonize_age_frame(df_total, 'age_name', age_index, ['val', 'upper', 'lower'])
 
     # Map sex names to codes
     df_attributable['sex_code'] = df_attributable['sex_name'].map({'Male': 'M', 'Female': 'F'})
@@ -667,6 +1161,7 @@ def extract_switzerland_risk_disease(cursor):
         'pollution_respiratory': [],
         'alcohol_cirrhosis': []
     }
+    uncertainty = {key: [] for key in data}
 
     # Define mappings from CSV names to our facts
     # Format: (risks for attributable, causes for both attributable and total)
@@ -701,9 +1196,16 @@ def extract_switzerland_risk_disease(cursor):
             # Switzerland has both total and attributable from IHME CSVs
             data[fact].append(('CHE', sex_code, age_group, year, total_deaths, attributable_deaths))
 
+        # Keep the ungrouped IHME rows with their 95% UI for uncertainty propagation
+        for measure, df in (('total', total_df), ('attributable', attr_df)):
+            uncertainty[fact].extend(zip(
+                ['CHE'] * len(df), df['sex_code'], df['age_group'], df['year'].astype(str),
+                [measure] * len(df), df['val'], df['lower'], df['upper']
+            ))
+
     print(f"    Extracted Switzerland: Smoking→LC={len(data['smoking_lung_cancer'])}, BMI→CVD={len(data['bmi_cardiovascular'])}, Pollution→Resp={len(data['pollution_respiratory'])}, Alcohol→Cirrhosis={len(data['alcohol_cirrhosis'])}")
     
-    return data
+    return data, uncertainty
     
     csv_files = glob.glob('/data/data_csv/IHME-GBD_2023_DATA-*.csv')
     if not csv_files:
@@ -797,140 +1299,775 @@ def extract_switzerland_risk_disease(cursor):
     
     return data
 
-def insert_fact_data(cursor, fact_table, columns, data):
-    """Insert data into fact table."""
-    if not data:
+def compute_uncertainty_bounds(components, n_samples=UNCERTAINTY_SAMPLES, seed=UNCERTAINTY_SEED):
+    """Propagate source 95% uncertainty intervals to fact cells by Monte Carlo sampling.
+
+    Each component is (country, sex, age, year, measure, val, lower, upper), where measure
+    is 'total' or 'attributable'; large sources pass the same components columnar instead
+    (see uncertainty_columns). Components are sampled from a split normal fitted to
+    their interval (independently), summed per cell and measure, and the sums are reduced
+    to UNCERTAINTY_PERCENTILES. Sampling runs as NumPy batches over many cells at once.
+    Measures none of whose components have an interval get no bounds (None).
+
+    Returns {(country, sex, age, year): (total_lower, total_upper, attr_lower, attr_upper)}.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(components, dict):
+        cells = components['cells']
+        cell_idx = components['cell']
+        is_attributable = components['attributable']
+        val = components['value'].astype(np.float64)
+        lower = components['lower'].astype(np.float64)
+        upper = components['upper'].astype(np.float64)
+    else:
+        df = pd.DataFrame(components, columns=['country', 'sex', 'age', 'year', 'measure', 'val', 'lower', 'upper'])
+        cell_idx, cells = pd.MultiIndex.from_frame(df[['country', 'sex', 'age', 'year']]).factorize()
+        is_attributable = df['measure'].to_numpy() == 'attributable'
+        val = df['val'].to_numpy(dtype=np.float64)
+        lower = df['lower'].to_numpy(dtype=np.float64, na_value=np.nan)
+        upper = df['upper'].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    if len(val) == 0:
+        return {}
+
+    # One slot per (cell, measure); sort components so each slot is a contiguous run
+    slot = np.asarray(cell_idx, dtype=np.int64) * 2 + is_attributable
+    order = np.argsort(slot, kind='stable')
+    slot = slot[order]
+    val = val[order]
+    # Missing bounds mean no known uncertainty for that component
+    has_interval = ~(np.isnan(lower) & np.isnan(upper))[order]
+    lower = np.where(np.isnan(lower[order]), val, lower[order])
+    upper = np.where(np.isnan(upper[order]), val, upper[order])
+    sd_lower = np.maximum(val - lower, 0) / 1.959964
+    sd_upper = np.maximum(upper - val, 0) / 1.959964
+
+    slot_ids, starts = np.unique(slot, return_index=True)
+    edges = np.append(starts, len(slot))
+    bounds = np.full((len(cells) * 2, 2), np.nan)
+
+    rng = np.random.default_rng(seed)
+    batch_rows = max(1, UNCERTAINTY_BATCH_VALUES // n_samples)
+    first = 0
+    while first < len(slot_ids):
+        # Take as many whole slots as fit into one batch (at least one)
+        last = np.searchsorted(edges, edges[first] + batch_rows, side='right') - 1
+        last = max(last, first + 1)
+        lo, hi = edges[first], edges[last]
+
+        z = rng.standard_normal((hi - lo, n_samples), dtype=np.float32)
+        scale = np.where(z < 0, sd_lower[lo:hi, None], sd_upper[lo:hi, None])
+        draws = val[lo:hi, None] + scale * z
+        sums = np.add.reduceat(draws, edges[first:last] - lo, axis=0)
+        bounds[slot_ids[first:last]] = np.percentile(sums, UNCERTAINTY_PERCENTILES, axis=1).T
+        first = last
+    
+    # A cell measure without any source interval has no UI at all, not a zero-width one
+    known = np.add.reduceat(has_interval, starts) > 0
+    bounds[slot_ids[~known]] = np.nan
+
+    bounds = bounds.reshape(len(cells), 4)
+    result = {}
+    for key, row in zip(cells, bounds.tolist()):
+        result[key] = tuple(None if np.isnan(v) else round(v, 2) for v in row)
+    return result
+
+def get_dimension_codes(cursor):
+    """Load the valid codes of every dimension for pre-load validation."""
+    codes = {}
+    for name, table, column in (('country', 'dim_country', 'country_code'),
+                                ('sex', 'dim_sex', 'sex_code'),
+                                ('age', 'dim_age_group', 'age_group_code'),
+                                ('year', 'dim_year', 'year')):
+        cursor.execute(f"SELECT {column} FROM {table}")
+        codes[name] = [row[0] for row in cursor.fetchall()]
+    return codes
+
+def warehouse_dimension_codes():
+    """Dimension codes of the running warehouse, or None when it cannot be reached."""
+    try:
+        conn = connect()
+    except Exception as e:
+        print(f"    Warehouse not reachable ({str(e).strip().splitlines()[0]}), keeping the seeded dimension codes")
+        return None
+    try:
+        return get_dimension_codes(conn.cursor())
+    finally:
+        conn.close()
+
+def validate_fact_rows(rows, dimension_codes):
+    """Validate and coalesce one batch of (country, sex, age, year, total, attributable) rows.
+
+    All rules run as vectorized pandas masks over the whole batch. A row breaking a rule
+    is rejected with the first failed rule as reason; remaining rows sharing a
+    (country, sex, age, year) key are summed into one row.
+
+    Returns (clean_rows, rejects, stats) where rejects are row + (reason,).
+    """
+    import pandas as pd
+
+    stats = {'rows': len(rows), 'duplicates': 0, 'rejected': {}}
+    malformed = [tuple(row[:6]) + (None,) * (6 - len(row[:6])) + ('malformed_row',) for row in rows if len(row) != 6]
+    rows = [row for row in rows if len(row) == 6]
+    if malformed:
+        stats['rejected']['malformed_row'] = len(malformed)
+    if not rows:
+        return [], malformed, stats
+
+    keys = ['country', 'sex', 'age', 'year']
+    df = pd.DataFrame(rows, columns=keys + ['total', 'attributable'])
+    df['total'] = pd.to_numeric(df['total'], errors='coerce')
+    df['attributable'] = pd.to_numeric(df['attributable'], errors='coerce')
+    year = pd.to_numeric(df['year'], errors='coerce')
+
+    # NaN attributable (AF-based countries) passes the comparisons below
+    rules = [
+        ('unknown_country', ~df['country'].isin(dimension_codes['country'])),
+        ('unknown_sex', ~df['sex'].isin(dimension_codes['sex'])),
+        ('unknown_age_group', ~df['age'].isin(dimension_codes['age'])),
+        ('year_out_of_range', ~year.isin(dimension_codes['year'])),
+        ('missing_total', df['total'].isna()),
+        ('negative_total', df['total'] < 0),
+        ('negative_attributable', df['attributable'] < 0),
+        ('attributable_exceeds_total', df['attributable'] > df['total'] + VALIDATION_TOLERANCE),
+    ]
+    reason = pd.Series(None, index=df.index, dtype=object)
+    for name, mask in rules:
+        reason = reason.mask(reason.isna() & mask, name)
+
+    rejected = df[reason.notna()].assign(reason=reason[reason.notna()])
+    rejected = rejected.astype(object).where(rejected.notna(), None)
+    stats['rejected'].update(rejected['reason'].value_counts().to_dict())
+
+    clean = df[reason.isna()]
+    stats['duplicates'] = int(clean.duplicated(keys).sum())
+    if stats['duplicates']:
+        clean = clean.groupby(keys, sort=False, as_index=False)[['total', 'attributable']].sum(min_count=1)
+    clean = clean.astype(object).where(clean.notna(), None)
+
+    return (list(clean.itertuples(index=False, name=None)),
+            malformed + list(rejected.itertuples(index=False, name=None)),
+            stats)
+
+def insert_fact_data(cursor, fact_table, columns, data, load_generation_id=None, dimensions=None):
+    """Bulk load a staged Arrow table into a fact table via COPY, tagging rows with load_generation_id when given.
+
+    Dimension codes are mapped to ids with one vectorized lookup per dimension (dimensions as
+    returned by load_dimension_ids, queried when not given) and the id and value columns go to
+    COPY as CSV written by pyarrow, without converting rows to Python objects.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    
+    if data.num_rows == 0:
         print(f"    No data to insert into {fact_table}")
         return 0
     
-    print(f"    Resolving dimensions for {len(data)} rows...")
+    print(f"    Resolving dimensions for {data.num_rows} rows of {fact_table}...")
     
-    # Resolve dimension IDs
-    final_data = []
-    failed_count = 0
-    for i, row in enumerate(data):
-        if len(row) != 6:
-            print(f"      ERROR: Row {i} has {len(row)} values instead of 6: {row}")
-            failed_count += 1
-            continue
-        country_code, sex_code, age_code, year, col1, col2 = row
-        
-        country_id = get_dimension_id(cursor, 'dim_country', 'country_code', country_code)
-        sex_id = get_dimension_id(cursor, 'dim_sex', 'sex_code', sex_code)
-        age_group_id = get_dimension_id(cursor, 'dim_age_group', 'age_group_code', age_code)
-        year_id = get_dimension_id(cursor, 'dim_year', 'year', int(year))
-        
-        if not all([country_id, sex_id, age_group_id, year_id]):
-            failed_count += 1
-            if failed_count <= 3:  # Show first 3 failures
-                print(f"      FAILED row {i}: country={country_code}→{country_id}, sex={sex_code}→{sex_id}, age={age_code}→{age_group_id}, year={year}→{year_id}")
-            continue
-        
-        final_data.append((country_id, sex_id, age_group_id, year_id, col1, col2))
+    # Code → id for all rows at once; unknown codes become null
+    dimensions = dimensions or load_dimension_ids(cursor)
+    ids = [pc.take(dimension_ids, pc.index_in(data.column(i).cast(codes.type), value_set=codes))
+           for i, (codes, dimension_ids) in enumerate(dimensions)]
+    resolved = pc.and_(pc.and_(pc.is_valid(ids[0]), pc.is_valid(ids[1])),
+                       pc.and_(pc.is_valid(ids[2]), pc.is_valid(ids[3])))
     
+    failed_count = data.num_rows - pc.sum(resolved).as_py()
     if failed_count > 0:
+        failed = data.filter(pc.invert(resolved)).slice(0, 3)
+        for row in zip(*(column.to_pylist() for column in failed.columns[:4])):  # Show first 3 failures
+            print(f"      FAILED row: country={row[0]}, sex={row[1]}, age={row[2]}, year={row[3]}")
         print(f"      Total failed: {failed_count} rows")
     
-    if not final_data:
+    table = pa.table(ids + data.columns[4:], names=list(columns)).filter(resolved)
+    if table.num_rows == 0:
         print(f"    No valid data after dimension resolution for {fact_table}")
         return 0
     
-    # Bulk insert
-    placeholders = ','.join(['%s'] * len(columns))
-    insert_query = f"INSERT INTO {fact_table} ({','.join(columns)}) VALUES ({placeholders})"
+    if load_generation_id is not None:
+        table = table.append_column('load_generation_id', pa.repeat(pa.scalar(load_generation_id, pa.int32()), table.num_rows))
     
-    cursor.executemany(insert_query, final_data)
-    print(f"    Inserted {len(final_data)} rows into {fact_table}")
-    return len(final_data)
+    # Bulk insert via COPY (null → empty unquoted field → NULL)
+    buffer = io.BytesIO()
+    pa_csv.write_csv(table, buffer, pa_csv.WriteOptions(include_header=False))
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {fact_table} ({','.join(table.column_names)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    print(f"    Inserted {table.num_rows} rows into {fact_table}")
+    return table.num_rows
 
-def main():
-    print("="*80)
-    print("EXTRACTING RISK→DISEASE RELATIONSHIPS FROM ALL 4 COUNTRIES")
-    print("="*80)
+def staging_path(source, key, staging_dir=None, staging_format=None, name='facts'):
+    """Path of a staged file of one (source, fact) partition ('facts' or 'rejects'), or of the source's population."""
+    staging_format = staging_format or STAGING_FORMAT
+    if key == 'population':
+        return os.path.join(staging_dir or STAGING_DIR, f'source={source}', f'population.{staging_format}')
+    return os.path.join(staging_dir or STAGING_DIR, f'source={source}', f'fact={key}', f'{name}.{staging_format}')
+
+def write_staging_table(table, path):
+    """Atomically write a pyarrow Table as Arrow IPC or Parquet (by file extension)."""
+    import pyarrow as pa
+    
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        pq.write_table(table, tmp_path)
+    else:
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    # Readers never see a half-written partition
+    os.replace(tmp_path, path)
+    return path
+
+def write_staging(source, key, rows, staging_dir=None, staging_format=None):
+    """Write harmonized fact (or population) rows of one source partition as an Arrow IPC or Parquet file."""
+    import pyarrow as pa
+    
+    staging_columns = POPULATION_STAGING_COLUMNS if key == 'population' else STAGING_COLUMNS
+    schema = pa.schema([
+        ('country_code', pa.string()), ('sex_code', pa.string()), ('age_group_code', pa.string()),
+        ('year', pa.int16()),
+    ] + [(column, pa.float64()) for column in staging_columns[4:]])
+    columns = list(zip(*rows)) if rows else [[] for _ in staging_columns]
+    columns[3] = [int(year) for year in columns[3]]
+    table = pa.Table.from_arrays([pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                                 schema=schema)
+    return write_staging_table(table, staging_path(source, key, staging_dir, staging_format))
+
+def write_staged_rejects(source, key, rejects, staging_dir=None, staging_format=None):
+    """Stage the rejected rows of one (source, fact) partition for the etl_reject quarantine at load time."""
+    import pyarrow as pa
+    
+    def text(value):
+        return None if value is None else str(value)
+    
+    def number(value):
+        try:
+            return None if value is None else float(value)
+        except (TypeError, ValueError):
+            return None
+    
+    columns = list(zip(*rejects)) if rejects else [[] for _ in range(7)]
+    table = pa.table({
+        'country_code': pa.array([text(v) for v in columns[0]], pa.string()),
+        'sex_code': pa.array([text(v) for v in columns[1]], pa.string()),
+        'age_group_code': pa.array([text(v) for v in columns[2]], pa.string()),
+        'year': pa.array([text(v) for v in columns[3]], pa.string()),
+        'total_deaths': pa.array([number(v) for v in columns[4]], pa.float64()),
+        'attributable_deaths': pa.array([number(v) for v in columns[5]], pa.float64()),
+        'reason': pa.array([text(v) for v in columns[6]], pa.string()),
+    })
+    return write_staging_table(table, staging_path(source, key, staging_dir, staging_format, name='rejects'))
+
+def read_staging(source, key, staging_dir=None, staging_format=None, name='facts'):
+    """Read one staged partition as a pyarrow Table (memory-mapped, zero-copy for Arrow IPC)."""
+    import pyarrow as pa
+    
+    path = staging_path(source, key, staging_dir, staging_format, name)
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return pq.read_table(path)
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+def read_staged_rejects(source, key, staging_dir=None, staging_format=None):
+    """Rejected rows staged for one (source, fact) partition (none for population or older staging)."""
+    if key == 'population' or not os.path.exists(staging_path(source, key, staging_dir, staging_format, name='rejects')):
+        return []
+    return staging_rows(read_staging(source, key, staging_dir, staging_format, name='rejects'))
+
+def open_staging_dataset(staging_dir=None, staging_format=None):
+    """Open all staged partitions as one pyarrow dataset (source/fact as partition columns), for analysts.
+
+    Files are memory-mapped, so Arrow IPC partitions are read without copying.
+    """
+    import pyarrow.dataset as ds
+    import pyarrow.fs as fs
+    
+    staging_dir = staging_dir or STAGING_DIR
+    staging_format = staging_format or STAGING_FORMAT
+    paths = sorted(glob.glob(os.path.join(staging_dir, 'source=*', 'fact=*', f'facts.{staging_format}')))
+    return ds.dataset(paths, format='ipc' if staging_format == 'arrow' else staging_format,
+                      filesystem=fs.LocalFileSystem(use_mmap=True),
+                      partitioning='hive', partition_base_dir=staging_dir)
+
+def staging_rows(table):
+    """Convert a small staged Arrow table (rejects) back into row tuples."""
+    return list(zip(*(column.to_pylist() for column in table.columns)))
+
+def extract_source(cursor, country_code):
+    """Run the extractor of one source country, returning (data, uncertainty)."""
+    if country_code == 'CHE':
+        return extract_switzerland_risk_disease(cursor)
+    
+    # USA is the largest dump and is parsed in parallel byte ranges straight from disk
+    if country_code == 'USA':
+        return extract_usa_risk_disease(cursor, SQL_FILES['USA'])
+    
+    extractors = {
+        'DEU': extract_germany_risk_disease,
+        'SWE': extract_sweden_risk_disease,
+    }
+    with open(SQL_FILES[country_code], 'r', encoding='utf-8', errors='ignore') as f:
+        return extractors[country_code](cursor, f.read())
+
+def start_load_generation(conn, resume=False):
+    """Open a new load generation (or reuse the unfinished one when resuming).
+
+    Returns (generation_id, checkpoints) where checkpoints maps (source, fact_table)
+    to (committed_chunks, is_complete).
+    """
+    cursor = conn.cursor()
+    generation_id = None
+    if resume:
+        cursor.execute("SELECT generation_id FROM etl_load_generation WHERE status = 'loading' ORDER BY generation_id DESC LIMIT 1")
+        result = cursor.fetchone()
+        generation_id = result[0] if result else None
+        if generation_id is None:
+            print("    No unfinished load generation found, starting a new one")
+    
+    if generation_id is None:
+        cursor.execute("INSERT INTO etl_load_generation (status) VALUES ('loading') RETURNING generation_id")
+        generation_id = cursor.fetchone()[0]
+    
+    cursor.execute(
+        "SELECT source, fact_table, COUNT(*), BOOL_OR(is_last) FROM etl_checkpoint "
+        "WHERE generation_id = %s GROUP BY source, fact_table",
+        (generation_id,)
+    )
+    checkpoints = {(source, fact_table): (chunks, done) for source, fact_table, chunks, done in cursor.fetchall()}
+    conn.commit()
+    cursor.close()
+    return generation_id, checkpoints
+
+def load_fact_chunks(conn, cursor, generation_id, source, fact_table, columns, data, checkpoint=(0, False), rejects=(),
+                     dimensions=None):
+    """Insert a staged Arrow table in LOAD_CHUNK_ROWS chunks, committing each chunk together with its checkpoint.
+
+    Rejected rows are quarantined in etl_reject within the transaction of the last chunk.
+    """
+    committed_chunks, done = checkpoint
+    if done:
+        print(f"    {source} → {fact_table}: already loaded ({committed_chunks} chunks), skipping")
+        return 0
+    
+    chunks = [data.slice(i, LOAD_CHUNK_ROWS) for i in range(0, data.num_rows, LOAD_CHUNK_ROWS)] or [data]
+    total = 0
+    for chunk_no, chunk in enumerate(chunks):
+        if chunk_no < committed_chunks:
+            continue
+        inserted = insert_fact_data(cursor, fact_table, columns, chunk, generation_id, dimensions)
+        if chunk_no == len(chunks) - 1 and rejects:
+            cursor.executemany(
+                "INSERT INTO etl_reject (generation_id, source, fact_table, country_code, sex_code, "
+                "age_group_code, year, total_deaths, attributable_deaths, reason) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                [(generation_id, source, fact_table) + tuple(row[:3])
+                 + (None if row[3] is None else str(row[3]),) + tuple(row[4:])
+                 for row in rejects]
+            )
+        cursor.execute(
+            "INSERT INTO etl_checkpoint (generation_id, source, fact_table, chunk_no, row_count, is_last) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            (generation_id, source, fact_table, chunk_no, inserted, chunk_no == len(chunks) - 1)
+        )
+        conn.commit()
+        total += inserted
+    return total
+
+def fact_columns(deaths_column):
+    """Column list of a fact table load, in the order of the staged rows."""
+    return ['country_id', 'sex_id', 'age_group_id', 'year_id',
+            deaths_column, 'attributable_deaths',
+            f'{deaths_column}_lower', f'{deaths_column}_upper',
+            'attributable_deaths_lower', 'attributable_deaths_upper']
+
+def load_targets():
+    """(data key, table, columns) of every table loaded from staging: the fact tables and population."""
+    targets = [(key, fact_table, fact_columns(deaths_column))
+               for key, (fact_table, deaths_column) in FACT_TABLES.items()]
+    targets.append(('population', POPULATION_TABLE, ['country_id', 'sex_id', 'age_group_id', 'year_id', 'population']))
+    return targets
+
+def current_generation_id(cursor):
+    """Id of the published load generation, or None before the first publish."""
+    cursor.execute("SELECT generation_id FROM etl_load_generation WHERE is_current")
+    result = cursor.fetchone()
+    return result[0] if result else None
+
+def carry_forward_rows(cursor, generation_id, previous_generation_id, source, fact_table, columns):
+    """Copy the rows and rejects of one source from the published generation into generation_id."""
+    if previous_generation_id is None:
+        return 0
+    cursor.execute(
+        f"INSERT INTO {fact_table} ({', '.join(columns)}, load_generation_id) "
+        f"SELECT {', '.join('f.' + column for column in columns)}, %s FROM {fact_table} f "
+        "JOIN dim_country c ON c.country_id = f.country_id "
+        "WHERE f.load_generation_id = %s AND c.country_code = %s",
+        (generation_id, previous_generation_id, source)
+    )
+    copied = cursor.rowcount
+    cursor.execute(
+        "INSERT INTO etl_reject (generation_id, source, fact_table, country_code, sex_code, "
+        "age_group_code, year, total_deaths, attributable_deaths, reason) "
+        "SELECT %s, source, fact_table, country_code, sex_code, age_group_code, year, "
+        "total_deaths, attributable_deaths, reason "
+        "FROM etl_reject WHERE generation_id = %s AND source = %s AND fact_table = %s",
+        (generation_id, previous_generation_id, source, fact_table)
+    )
+    return copied
+
+def load_fact_table(pool, generation_id, key, fact_table, columns, checkpoints, countries, previous_generation_id):
+    """Load one table on its own pooled connection.
+
+    Sources in countries are loaded from their staged partitions; the other sources keep
+    their rows of the published generation (previous_generation_id).
+    """
+    conn = pool.getconn()
+    try:
+        cursor = conn.cursor()
+        dimensions = load_dimension_ids(cursor)
+        total = 0
+        for country_code, _, _ in SOURCES:
+            checkpoint = checkpoints.get((country_code, fact_table), (0, False))
+            if country_code in countries or checkpoint[1]:
+                table = None if checkpoint[1] else read_staging(country_code, key)
+                rejects = [] if checkpoint[1] else read_staged_rejects(country_code, key)
+                total += load_fact_chunks(
+                    conn, cursor, generation_id, country_code, fact_table, columns,
+                    table, checkpoint, rejects, dimensions
+                )
+                continue
+            
+            copied = carry_forward_rows(cursor, generation_id, previous_generation_id, country_code, fact_table, columns)
+            cursor.execute(
+                "INSERT INTO etl_checkpoint (generation_id, source, fact_table, chunk_no, row_count, is_last) "
+                "VALUES (%s, %s, %s, 0, %s, TRUE)",
+                (generation_id, country_code, fact_table, copied)
+            )
+            conn.commit()
+            print(f"    {country_code} → {fact_table}: kept {copied} rows of generation {previous_generation_id}")
+            total += copied
+        cursor.close()
+        return total
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
+
+def publish_load_generation(conn, generation_id):
+    """Switch readers to generation_id in one transaction, drop rows of older generations and
+    refresh the precomputed rate views."""
+    cursor = conn.cursor()
+    cursor.execute("UPDATE etl_load_generation SET is_current = FALSE WHERE is_current AND generation_id <> %s", (generation_id,))
+    cursor.execute(
+        "UPDATE etl_load_generation SET is_current = TRUE, status = 'published', published_at = now() "
+        "WHERE generation_id = %s",
+        (generation_id,)
+    )
+    for _, fact_table, _ in load_targets():
+        cursor.execute(f"DELETE FROM {fact_table} WHERE load_generation_id <> %s", (generation_id,))
+    cursor.execute("DELETE FROM etl_load_generation WHERE generation_id <> %s", (generation_id,))
+    # Crude rates first - the age-standardized view is computed from them
+    cursor.execute("REFRESH MATERIALIZED VIEW mv_death_rates")
+    cursor.execute("REFRESH MATERIALIZED VIEW mv_age_standardized_rates")
+    conn.commit()
+    cursor.close()
+
+def connect():
+    """Open the warehouse connection; psycopg2 is imported only by stages that need PostgreSQL."""
+    import psycopg2
+    return psycopg2.connect(**PG_CONFIG)
+
+def staged_tables(cursor, generation_id):
+    """(source, fact_table) pairs staged for generation_id (see run_extract)."""
+    cursor.execute("SELECT source, fact_table FROM etl_staged WHERE generation_id = %s", (generation_id,))
+    return set(cursor.fetchall())
+
+def run_extract(conn, countries, facts, stage=True, checkpoints=None, generation_id=None):
+    """Extract and validate the selected sources and facts.
+
+    With stage=True the validated facts get uncertainty bounds and are staged together with
+    their rejects and the source's population; with a generation_id the staged tables are
+    recorded in etl_staged. Sources whose selected tables are already loaded (checkpoints)
+    or staged in the resumed generation are skipped.
+
+    Without conn (extract, validate) rows are checked against the seeded DIMENSION_CODES;
+    the warehouse is queried only if a source has codes outside them.
+    """
+    cursor = conn.cursor() if conn else None
+    dimension_codes = get_dimension_codes(cursor) if cursor else DIMENSION_CODES
+    staged = staged_tables(cursor, generation_id) if generation_id is not None else set()
+    if conn:
+        conn.commit()
+    
+    targets = [fact_table for key, fact_table, _ in load_targets() if key in facts or key == 'population']
+    sources = [source for source in SOURCES if source[0] in countries]
+    for i, (country_code, country_name, approach) in enumerate(sources, 1):
+        print(f"\n[{i}/{len(sources)}] {country_name} - {approach}")
+        
+        # Skip parsing entirely when every selected table of this source is durable or staged for this generation
+        checkpoints = checkpoints or {}
+        if all(checkpoints.get((country_code, fact_table), (0, False))[1] or (country_code, fact_table) in staged
+               for fact_table in targets):
+            print("    Already staged or loaded in this generation, skipping")
+            continue
+        
+        data, uncertainty = extract_source(cursor, country_code)
+        
+        # Reject rule violations and coalesce duplicate keys before touching the database
+        validated = {key: validate_fact_rows(data.get(key, []), dimension_codes) for key in facts}
+        if dimension_codes is DIMENSION_CODES and any(DIMENSION_REJECT_REASONS & stats['rejected'].keys()
+                                                      for _, _, stats in validated.values()):
+            # The warehouse may have dimension rows beyond the seed
+            dimension_codes = warehouse_dimension_codes() or dimension_codes
+            if dimension_codes is not DIMENSION_CODES:
+                validated = {key: validate_fact_rows(data.get(key, []), dimension_codes) for key in facts}
+        rejects = {}
+        for key in facts:
+            data[key], rejects[key], stats = validated[key]
+            rejected = ', '.join(f"{reason}={count}" for reason, count in stats['rejected'].items()) or 'none'
+            print(f"    Validated {key}: {stats['rows']} rows, {stats['duplicates']} duplicates coalesced, rejected: {rejected}")
+        
+        if not stage:
+            continue
+        
+        # Propagate source uncertainty intervals to every fact cell
+        for key in facts:
+            bounds = compute_uncertainty_bounds(uncertainty.get(key, []))
+            data[key] = [row + bounds.get(row[:4], (None, None, None, None)) for row in data[key]]
+        print(f"    Uncertainty: {UNCERTAINTY_SAMPLES} Monte Carlo samples per cell")
+        
+        # Stage harmonized facts and their rejects; the loader bulk-loads from these partitions
+        for key in facts:
+            write_staging(country_code, key, data[key])
+            write_staged_rejects(country_code, key, rejects[key])
+        # Sources without population data stage an empty partition (no per-capita rates)
+        write_staging(country_code, 'population', data.get('population', []))
+        print(f"    Staged {len(facts)} fact partitions and {len(data.get('population', []))} population rows "
+              f"in {STAGING_DIR}/source={country_code}/")
+        
+        # A resumed run loads this source from staging instead of parsing it again
+        if generation_id is not None:
+            cursor.executemany(
+                "INSERT INTO etl_staged (generation_id, source, fact_table) VALUES (%s, %s, %s) ON CONFLICT DO NOTHING",
+                [(generation_id, country_code, fact_table) for fact_table in targets]
+            )
+            conn.commit()
+    if cursor:
+        cursor.close()
+
+def run_load(conn, generation_id, checkpoints, countries, facts):
+    """Load the selected staged partitions into generation_id concurrently and publish it.
+
+    Unselected sources and facts keep their rows of the published generation.
+    Returns (fact rows, population rows) of the generation.
+    """
+    import psycopg2.pool
     
-    conn = psycopg2.connect(**PG_CONFIG)
     cursor = conn.cursor()
+    previous_generation_id = current_generation_id(cursor)
+    conn.commit()
+    cursor.close()
+    
+    # Load the independent tables concurrently, one connection each
+    print("\n" + "="*80)
+    print(f"LOADING FACT TABLES AND POPULATION ({LOAD_CONNECTIONS} concurrent connections)")
+    print("="*80)
     
+    pool = psycopg2.pool.ThreadedConnectionPool(1, LOAD_CONNECTIONS, **PG_CONFIG)
     try:
-        # Collect data from all 4 countries
-        all_data = {
-            'smoking_lung_cancer': [],
-            'bmi_cardiovascular': [],
-            'pollution_respiratory': [],
-            'alcohol_cirrhosis': []
-        }
-        
-        # 1. USA - fact_disease_risk (has attributable deaths!)
-        print("\n[1/4] USA - Direct risk→disease attribution")
-        with open(SQL_FILES['USA'], 'r', encoding='utf-8', errors='ignore') as f:
-            usa_data = extract_usa_risk_disease(cursor, f.read())
-            for key in all_data.keys():
-                all_data[key].extend(usa_data[key])
-        
-        # 2. Germany - Join lm_* with dm_* tables
-        print("\n[2/4] Germany - Correlation approach")
-        with open(SQL_FILES['DEU'], 'r', encoding='utf-8', errors='ignore') as f:
-            deu_data = extract_germany_risk_disease(cursor, f.read())
-            for key in all_data.keys():
-                all_data[key].extend(deu_data[key])
-        
-        # 3. Sweden - disease_data and faktor_data tables
-        print("\n[3/4] Sweden - Health registry data")
-        with open(SQL_FILES['SWE'], 'r', encoding='utf-8', errors='ignore') as f:
-            swe_data = extract_sweden_risk_disease(cursor, f.read())
-            for key in all_data.keys():
-                all_data[key].extend(swe_data[key])
-        
-        # 4. Switzerland - PostgreSQL lm_* and dm_* tables
-        print("\n[4/4] Switzerland - PostgreSQL tables")
-        che_data = extract_switzerland_risk_disease(cursor)
-        for key in all_data.keys():
-            all_data[key].extend(che_data[key])
-        
-        # Insert into fact tables
-        print("\n" + "="*80)
-        print("INSERTING INTO FACT TABLES")
-        print("="*80)
+        with ThreadPoolExecutor(max_workers=LOAD_CONNECTIONS) as executor:
+            futures = [executor.submit(load_fact_table, pool, generation_id, key, fact_table, columns, checkpoints,
+                                       countries if key in facts or key == 'population' else (),
+                                       previous_generation_id)
+                       for key, fact_table, columns in load_targets()]
+        *fact_totals, population_total = [future.result() for future in futures]
+    finally:
+        pool.closeall()
+    
+    # Readers switch to the new generation only once everything is loaded
+    publish_load_generation(conn, generation_id)
+    return sum(fact_totals), population_total
+
+def report_query(facts=None, countries=None):
+    """Deaths per country and year of the published generation (default AF scenario).
+
+    One total/attributable column pair per fact; with countries the query takes the list of
+    country codes as its single parameter.
+    """
+    facts = facts or list(FACT_TABLES)
+    columns, joins, conditions = [], [], []
+    for key in facts:
+        label = REPORT_LABELS[key]
+        columns += [f"COALESCE(ROUND({label}.total_{label}, 0), 0) as total_{label}",
+                    f"COALESCE(ROUND({label}.attr_{label}, 0), 0) as attr_{label}"]
+        joins.append(f"""LEFT JOIN (
+        SELECT country_id, year_id,
+               SUM({FACT_TABLES[key][1]}) as total_{label},
+               SUM(attributable_deaths) as attr_{label}
+        FROM v_{key}
+        WHERE is_default
+        GROUP BY country_id, year_id
+    ) {label} ON c.country_id = {label}.country_id AND y.year_id = {label}.year_id""")
+        conditions.append(f"{label}.total_{label} IS NOT NULL")
+    
+    where = f"({' OR '.join(conditions)})"
+    if countries:
+        where += " AND c.country_code = ANY(%s)"
+    select = ',\n        '.join(['c.country_name', 'y.year'] + columns)
+    joins = '\n    '.join(joins)
+    return f"""SELECT
+        {select}
+    FROM dim_country c
+    CROSS JOIN dim_year y
+    {joins}
+    WHERE {where}
+    ORDER BY c.country_name, y.year"""
+
+def print_rows(cursor):
+    """Print the result of the last query as an aligned table."""
+    headers = [column[0] for column in cursor.description]
+    rows = [['' if value is None else str(value) for value in row] for row in cursor.fetchall()]
+    widths = [max([len(header)] + [len(row[i]) for row in rows]) for i, header in enumerate(headers)]
+    print("    " + " | ".join(header.ljust(width) for header, width in zip(headers, widths)))
+    print("    " + "-+-".join('-' * width for width in widths))
+    for row in rows:
+        print("    " + " | ".join(value.rjust(width) for value, width in zip(row, widths)))
+    print(f"    ({len(rows)} rows)")
+
+def run_report(conn, countries, facts):
+    """Print the report of the published generation for the selected countries and facts."""
+    cursor = conn.cursor()
+    all_countries = len(countries) == len(SOURCES)
+    cursor.execute(report_query(facts, None if all_countries else countries),
+                   None if all_countries else (list(countries),))
+    print_rows(cursor)
+    cursor.close()
+
+def run_status():
+    """Print staged partitions, load generations, checkpoints of unfinished loads and rejects."""
+    print(f"Staged partitions in {STAGING_DIR}/:")
+    paths = sorted(glob.glob(os.path.join(STAGING_DIR, 'source=*', '**', f'*.{STAGING_FORMAT}'), recursive=True))
+    for path in paths:
+        print(f"    {os.path.relpath(path, STAGING_DIR)} ({os.path.getsize(path)} bytes)")
+    if not paths:
+        print("    none")
+    
+    conn = connect()
+    cursor = conn.cursor()
+    try:
+        print("\nLoad generations:")
+        cursor.execute("SELECT generation_id, status, is_current, started_at, published_at "
+                       "FROM etl_load_generation ORDER BY generation_id")
+        print_rows(cursor)
         
-        total = 0
+        generation_id = current_generation_id(cursor)
+        if generation_id is not None:
+            print(f"\nRows in published generation {generation_id}:")
+            cursor.execute(" UNION ALL ".join(
+                f"SELECT '{fact_table}' AS table_name, COUNT(*) AS row_count FROM {fact_table} WHERE load_generation_id = %(generation)s"
+                for _, fact_table, _ in load_targets()
+            ), {'generation': generation_id})
+            print_rows(cursor)
+            
+            print("\nRejected rows:")
+            cursor.execute("SELECT source, fact_table, reason, COUNT(*) AS row_count FROM etl_reject "
+                           "WHERE generation_id = %s GROUP BY 1, 2, 3 ORDER BY 4 DESC", (generation_id,))
+            print_rows(cursor)
         
-        print("\n[1/4] fact_smoking_lung_cancer")
-        total += insert_fact_data(
-            cursor, 'fact_smoking_lung_cancer',
-            ['country_id', 'sex_id', 'age_group_id', 'year_id', 
-             'lung_cancer_deaths', 'attributable_deaths'],
-            all_data['smoking_lung_cancer']
+        print("\nStaged sources of unfinished loads (not parsed again with --resume):")
+        cursor.execute(
+            "SELECT s.generation_id, s.source, COUNT(*) AS tables, MAX(s.staged_at) AS staged_at FROM etl_staged s "
+            "JOIN etl_load_generation g ON g.generation_id = s.generation_id AND g.status = 'loading' "
+            "GROUP BY 1, 2 ORDER BY 1, 2"
         )
+        print_rows(cursor)
         
-        print("\n[2/4] fact_bmi_cardiovascular")
-        total += insert_fact_data(
-            cursor, 'fact_bmi_cardiovascular',
-            ['country_id', 'sex_id', 'age_group_id', 'year_id',
-             'cvd_deaths', 'attributable_deaths'],
-            all_data['bmi_cardiovascular']
+        print("\nUnfinished loads (continue with --resume):")
+        cursor.execute(
+            "SELECT c.generation_id, c.source, c.fact_table, COUNT(*) AS chunks, SUM(c.row_count) AS row_count, "
+            "BOOL_OR(c.is_last) AS done FROM etl_checkpoint c "
+            "JOIN etl_load_generation g ON g.generation_id = c.generation_id AND g.status = 'loading' "
+            "GROUP BY 1, 2, 3 ORDER BY 1, 2, 3"
         )
+        print_rows(cursor)
+    finally:
+        cursor.close()
+        conn.close()
+
+def parse_args(argv=None):
+    """Parse the stage subcommand and its country/fact selection (no subcommand = run)."""
+    selection = argparse.ArgumentParser(add_help=False)
+    selection.add_argument('--country', nargs='+', choices=[code for code, _, _ in SOURCES],
+                           default=[code for code, _, _ in SOURCES], help="source countries (default: all)")
+    selection.add_argument('--fact', nargs='+', choices=list(FACT_TABLES), default=list(FACT_TABLES),
+                           help="fact tables (default: all)")
+    resume = argparse.ArgumentParser(add_help=False)
+    resume.add_argument('--resume', action='store_true',
+                        help="continue the last unfinished load, skipping chunks that are already committed")
+    
+    parser = argparse.ArgumentParser(description="Extract RISK→DISEASE relationships into the PostgreSQL star schema.")
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    run = commands.add_parser('run', parents=[selection, resume], help="extract, validate, stage and load (default)")
+    run.add_argument('--from-staging', action='store_true',
+                     help=f"load the harmonized facts staged in {STAGING_DIR}/ instead of parsing the raw sources")
+    commands.add_parser('extract', parents=[selection], help="parse, validate and stage sources without loading")
+    commands.add_parser('validate', parents=[selection], help="parse and validate sources, write nothing")
+    commands.add_parser('load', parents=[selection, resume],
+                        help="load staged partitions into a new generation and publish it")
+    commands.add_parser('report', parents=[selection], help="deaths per country and year of the published generation")
+    commands.add_parser('status', help="staged partitions, load generations, rejects and unfinished loads")
+    
+    # Without a subcommand (options only) run the whole pipeline, as run_etl.sh does
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or (argv[0].startswith('-') and argv[0] not in ('-h', '--help')):
+        argv = ['run'] + argv
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    if args.command == 'status':
+        run_status()
+        return
+    
+    # Extraction and validation only read source files; no warehouse connection is needed
+    if args.command in ('extract', 'validate'):
+        print("="*80)
+        print(f"{args.command.upper()}: {', '.join(args.country)} × {len(args.fact)} RISK→DISEASE facts")
+        print("="*80)
+        run_extract(None, args.country, args.fact, stage=args.command == 'extract')
+        print(f"\n✅ {args.command.capitalize()} finished")
+        return
+    
+    conn = connect()
+    try:
+        if args.command == 'report':
+            run_report(conn, args.country, args.fact)
+            return
         
-        print("\n[3/4] fact_pollution_respiratory")
-        total += insert_fact_data(
-            cursor, 'fact_pollution_respiratory',
-            ['country_id', 'sex_id', 'age_group_id', 'year_id',
-             'respiratory_deaths', 'attributable_deaths'],
-            all_data['pollution_respiratory']
-        )
+        print("="*80)
+        print(f"EXTRACTING RISK→DISEASE RELATIONSHIPS FROM {len(args.country)} OF {len(SOURCES)} COUNTRIES")
+        print("="*80)
         
-        print("\n[4/4] fact_alcohol_cirrhosis")
-        total += insert_fact_data(
-            cursor, 'fact_alcohol_cirrhosis',
-            ['country_id', 'sex_id', 'age_group_id', 'year_id',
-             'cirrhosis_deaths', 'attributable_deaths'],
-            all_data['alcohol_cirrhosis']
-        )
+        generation_id, checkpoints = start_load_generation(conn, args.resume)
+        print(f"\nLoad generation {generation_id} ({len(checkpoints)} source/fact checkpoints committed)")
         
-        conn.commit()
+        if args.command == 'run' and not args.from_staging:
+            run_extract(conn, args.country, args.fact, checkpoints=checkpoints, generation_id=generation_id)
+        else:
+            print(f"    Using staged partitions in {STAGING_DIR}/")
+        
+        total, population_total = run_load(conn, generation_id, checkpoints, args.country, args.fact)
         
         print("\n" + "="*80)
-        print(f"✅ SUCCESS! Inserted {total} total rows across 4 RISK→DISEASE fact tables")
-        print(f"✅ Each fact table contains data from ALL 4 countries (CHE, DEU, NOR, USA)")
+        print(f"✅ SUCCESS! {total} rows across {len(FACT_TABLES)} RISK→DISEASE fact tables "
+              f"(reloaded: {', '.join(args.country)} × {len(args.fact)} facts, the rest kept)")
+        print(f"✅ {population_total} population rows; per-capita rate views refreshed")
+        print(f"✅ Load generation {generation_id} published")
         print("="*80)
         
     except Exception as e:
@@ -938,9 +2075,10 @@ def main():
         import traceback
         traceback.print_exc()
         conn.rollback()
+        if args.command in ('run', 'load'):
+            print("Committed chunks are kept - rerun with --resume to continue this load.")
         sys.exit(1)
     finally:
-        cursor.close()
         conn.close()
 
 if __name__ == '__main__':
@@ -12,14 +12,15 @@ DROP TABLE IF EXISTS dim_country CASCADE;
 CREATE TABLE dim_country (
     country_id SERIAL PRIMARY KEY,
     country_code VARCHAR(3) UNIQUE NOT NULL,
-    country_name VARCHAR(100) NOT NULL
+    country_name VARCHAR(100) NOT NULL,
+    death_basis VARCHAR(10) NOT NULL DEFAULT 'count'  -- count = počty úmrtí, sdr = prepočet zo SDR × populácia
 );
 
-INSERT INTO dim_country (country_code, country_name) VALUES
-('CHE', 'Switzerland'),
-('DEU', 'Germany'),
-('SWE', 'Sweden'),
-('USA', 'United States');
+INSERT INTO dim_country (country_code, country_name, death_basis) VALUES
+('CHE', 'Switzerland', 'count'),
+('DEU', 'Germany', 'sdr'),
+('SWE', 'Sweden', 'count'),
+('USA', 'United States', 'count');
 
 -- Dimension: Pohlavie
 DROP TABLE IF EXISTS dim_sex CASCADE;
@@ -41,15 +42,16 @@ CREATE TABLE dim_age_group (
     age_group_code VARCHAR(20) UNIQUE NOT NULL,
     age_group_name VARCHAR(100) NOT NULL,
     age_from INTEGER,
-    age_to INTEGER
+    age_to INTEGER,
+    std_population NUMERIC(10, 2)           -- WHO World Standard Population 2000-2025 (na 100 000)
 );
 
-INSERT INTO dim_age_group (age_group_code, age_group_name, age_from, age_to) VALUES
-('0-14', '0-14 years', 0, 14),
-('15-49', '15-49 years', 15, 49),
-('50-69', '50-69 years', 50, 69),
-('70+', '70+ years', 70, NULL),
-('ALL', 'All ages', 0, NULL);
+INSERT INTO dim_age_group (age_group_code, age_group_name, age_from, age_to, std_population) VALUES
+('0-14', '0-14 years', 0, 14, 26150),
+('15-49', '15-49 years', 15, 49, 52010),
+('50-69', '50-69 years', 50, 69, 16600),
+('70+', '70+ years', 70, NULL, 5275),
+('ALL', 'All ages', 0, NULL, NULL);
 
 -- Dimension: Roky
 DROP TABLE IF EXISTS dim_year CASCADE;
@@ -61,6 +63,135 @@ CREATE TABLE dim_year (
 INSERT INTO dim_year (year) VALUES
 (2013), (2014), (2015), (2016), (2017), (2018), (2019), (2020), (2021), (2022), (2023);
 
+-- Dimension: Scenáre attributable fractions (AF) - verzované what-if predpoklady
+DROP TABLE IF EXISTS dim_af_scenario CASCADE;
+CREATE TABLE dim_af_scenario (
+    scenario_id SERIAL PRIMARY KEY,
+    scenario_code VARCHAR(50) NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    description VARCHAR(255),
+    is_default BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at TIMESTAMP NOT NULL DEFAULT now(),
+    UNIQUE(scenario_code, version)
+);
+
+-- Najviac jeden default scenár (používa ho report v run_etl.sh)
+CREATE UNIQUE INDEX idx_af_scenario_default ON dim_af_scenario(is_default) WHERE is_default;
+
+INSERT INTO dim_af_scenario (scenario_code, version, description, is_default) VALUES
+('BASELINE', 1, 'DEU: RKI, GBD 2019; SWE: epidemiologická literatúra', TRUE);
+
+-- AF pre krajiny bez priamej atribúcie (DEU, SWE): attributable = total × af
+DROP TABLE IF EXISTS af_assumption CASCADE;
+CREATE TABLE af_assumption (
+    scenario_id INTEGER NOT NULL REFERENCES dim_af_scenario(scenario_id) ON DELETE CASCADE,
+    fact_name VARCHAR(50) NOT NULL,         -- smoking_lung_cancer, bmi_cardiovascular, ...
+    country_id INTEGER NOT NULL REFERENCES dim_country(country_id),
+    af NUMERIC(5, 4) NOT NULL CHECK (af BETWEEN 0 AND 1),
+    af_lower NUMERIC(5, 4),                 -- dolná hranica rozsahu AF
+    af_upper NUMERIC(5, 4),                 -- horná hranica rozsahu AF
+    PRIMARY KEY (scenario_id, fact_name, country_id)
+);
+
+INSERT INTO af_assumption (scenario_id, fact_name, country_id, af, af_lower, af_upper)
+SELECT s.scenario_id, v.fact_name, c.country_id, v.af, v.af_lower, v.af_upper
+FROM (VALUES
+    ('DEU', 'smoking_lung_cancer', 0.80, 0.75, 0.85),
+    ('DEU', 'bmi_cardiovascular', 0.15, 0.10, 0.20),
+    ('DEU', 'pollution_respiratory', 0.20, 0.15, 0.25),
+    ('DEU', 'alcohol_cirrhosis', 0.48, 0.40, 0.56),
+    ('SWE', 'smoking_lung_cancer', 0.75, 0.70, 0.80),
+    ('SWE', 'bmi_cardiovascular', 0.15, 0.10, 0.20),
+    ('SWE', 'pollution_respiratory', 0.20, 0.15, 0.25),
+    ('SWE', 'alcohol_cirrhosis', 0.55, 0.50, 0.60)
+) AS v(country_code, fact_name, af, af_lower, af_upper)
+JOIN dim_country c ON c.country_code = v.country_code
+CROSS JOIN dim_af_scenario s
+WHERE s.scenario_code = 'BASELINE' AND s.version = 1;
+
+-- Nový scenár = kópia AF z poslednej verzie base scenára, ktorú potom upravíš cez UPDATE af_assumption
+CREATE OR REPLACE FUNCTION create_af_scenario(p_code VARCHAR, p_description VARCHAR, p_base_code VARCHAR DEFAULT 'BASELINE')
+RETURNS INTEGER AS $$
+DECLARE
+    base_id INTEGER;
+    new_id INTEGER;
+BEGIN
+    -- Základ sa určí pred vložením novej verzie (pri p_code = p_base_code by inak vyhrala nová prázdna verzia)
+    SELECT scenario_id INTO base_id FROM dim_af_scenario
+    WHERE scenario_code = p_base_code
+    ORDER BY version DESC LIMIT 1;
+
+    INSERT INTO dim_af_scenario (scenario_code, version, description)
+    SELECT p_code, COALESCE(MAX(version), 0) + 1, p_description
+    FROM dim_af_scenario WHERE scenario_code = p_code
+    RETURNING scenario_id INTO new_id;
+
+    INSERT INTO af_assumption (scenario_id, fact_name, country_id, af, af_lower, af_upper)
+    SELECT new_id, a.fact_name, a.country_id, a.af, a.af_lower, a.af_upper
+    FROM af_assumption a
+    WHERE a.scenario_id = base_id;
+    RETURN new_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================
+-- ETL - GENERÁCIE NAČÍTANIA A CHECKPOINTY
+-- ============================================================
+
+-- Každý beh ETL zapisuje do novej generácie; čitatelia (views) vidia iba is_current
+DROP TABLE IF EXISTS etl_load_generation CASCADE;
+CREATE TABLE etl_load_generation (
+    generation_id SERIAL PRIMARY KEY,
+    status VARCHAR(20) NOT NULL DEFAULT 'loading',  -- loading, published
+    is_current BOOLEAN NOT NULL DEFAULT FALSE,
+    started_at TIMESTAMP NOT NULL DEFAULT now(),
+    published_at TIMESTAMP
+);
+
+CREATE UNIQUE INDEX idx_load_generation_current ON etl_load_generation(is_current) WHERE is_current;
+
+-- Commitnuté chunky per (zdroj, fact tabuľka) - základ pre --resume
+DROP TABLE IF EXISTS etl_checkpoint CASCADE;
+CREATE TABLE etl_checkpoint (
+    generation_id INTEGER NOT NULL REFERENCES etl_load_generation(generation_id) ON DELETE CASCADE,
+    source VARCHAR(3) NOT NULL,             -- kód krajiny zdroja
+    fact_table VARCHAR(50) NOT NULL,
+    chunk_no INTEGER NOT NULL,
+    row_count INTEGER NOT NULL,
+    is_last BOOLEAN NOT NULL DEFAULT FALSE, -- posledný chunk = (zdroj, tabuľka) hotová
+    committed_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (generation_id, source, fact_table, chunk_no)
+);
+
+-- Zdroje a tabuľky vyextrahované do stagingu v rámci generácie - --resume ich znova neparsuje
+DROP TABLE IF EXISTS etl_staged CASCADE;
+CREATE TABLE etl_staged (
+    generation_id INTEGER NOT NULL REFERENCES etl_load_generation(generation_id) ON DELETE CASCADE,
+    source VARCHAR(3) NOT NULL,
+    fact_table VARCHAR(50) NOT NULL,
+    staged_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (generation_id, source, fact_table)
+);
+
+-- Karanténa riadkov, ktoré neprešli validáciou pred načítaním
+DROP TABLE IF EXISTS etl_reject CASCADE;
+CREATE TABLE etl_reject (
+    reject_id SERIAL PRIMARY KEY,
+    generation_id INTEGER NOT NULL REFERENCES etl_load_generation(generation_id) ON DELETE CASCADE,
+    source VARCHAR(3) NOT NULL,
+    fact_table VARCHAR(50) NOT NULL,
+    country_code VARCHAR(3),
+    sex_code VARCHAR(10),
+    age_group_code VARCHAR(20),
+    year VARCHAR(10),
+    total_deaths NUMERIC,
+    attributable_deaths NUMERIC,
+    reason VARCHAR(50) NOT NULL,            -- napr. attributable_exceeds_total, year_out_of_range
+    rejected_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE INDEX idx_etl_reject_generation ON etl_reject(generation_id, fact_table);
+
 -- ============================================================
 -- FACT TABLES - RISK→DISEASE RELATIONSHIPS
 -- ============================================================
@@ -75,7 +206,12 @@ CREATE TABLE fact_smoking_lung_cancer (
     year_id INTEGER NOT NULL REFERENCES dim_year(year_id),
     lung_cancer_deaths NUMERIC(15, 2),      -- úmrtia na rakovinu pľúc
     attributable_deaths NUMERIC(15, 2),     -- úmrtia pripisateľné fajčeniu
-    UNIQUE(country_id, sex_id, age_group_id, year_id)
+    lung_cancer_deaths_lower NUMERIC(15, 2), -- dolná hranica 95% UI (Monte Carlo)
+    lung_cancer_deaths_upper NUMERIC(15, 2), -- horná hranica 95% UI (Monte Carlo)
+    attributable_deaths_lower NUMERIC(15, 2),
+    attributable_deaths_upper NUMERIC(15, 2),
+    load_generation_id INTEGER NOT NULL REFERENCES etl_load_generation(generation_id),
+    UNIQUE(load_generation_id, country_id, sex_id, age_group_id, year_id)
 );
 
 CREATE INDEX idx_smoking_lc_country ON fact_smoking_lung_cancer(country_id);
@@ -91,7 +227,12 @@ CREATE TABLE fact_bmi_cardiovascular (
     year_id INTEGER NOT NULL REFERENCES dim_year(year_id),
     cvd_deaths NUMERIC(15, 2),              -- úmrtia na kardiovaskulárne choroby
     attributable_deaths NUMERIC(15, 2),     -- úmrtia pripisateľné vysokému BMI
-    UNIQUE(country_id, sex_id, age_group_id, year_id)
+    cvd_deaths_lower NUMERIC(15, 2),         -- dolná hranica 95% UI (Monte Carlo)
+    cvd_deaths_upper NUMERIC(15, 2),         -- horná hranica 95% UI (Monte Carlo)
+    attributable_deaths_lower NUMERIC(15, 2),
+    attributable_deaths_upper NUMERIC(15, 2),
+    load_generation_id INTEGER NOT NULL REFERENCES etl_load_generation(generation_id),
+    UNIQUE(load_generation_id, country_id, sex_id, age_group_id, year_id)
 );
 
 CREATE INDEX idx_bmi_cvd_country ON fact_bmi_cardiovascular(country_id);
@@ -107,7 +248,12 @@ CREATE TABLE fact_pollution_respiratory (
     year_id INTEGER NOT NULL REFERENCES dim_year(year_id),
     respiratory_deaths NUMERIC(15, 2),      -- úmrtia na respiračné choroby
     attributable_deaths NUMERIC(15, 2),     -- úmrtia pripisateľné znečisteniu
-    UNIQUE(country_id, sex_id, age_group_id, year_id)
+    respiratory_deaths_lower NUMERIC(15, 2), -- dolná hranica 95% UI (Monte Carlo)
+    respiratory_deaths_upper NUMERIC(15, 2), -- horná hranica 95% UI (Monte Carlo)
+    attributable_deaths_lower NUMERIC(15, 2),
+    attributable_deaths_upper NUMERIC(15, 2),
+    load_generation_id INTEGER NOT NULL REFERENCES etl_load_generation(generation_id),
+    UNIQUE(load_generation_id, country_id, sex_id, age_group_id, year_id)
 );
 
 CREATE INDEX idx_pollution_resp_country ON fact_pollution_respiratory(country_id);
@@ -123,8 +269,159 @@ CREATE TABLE fact_alcohol_cirrhosis (
     year_id INTEGER NOT NULL REFERENCES dim_year(year_id),
     cirrhosis_deaths NUMERIC(15, 2),        -- úmrtia na cirhózu pečene
     attributable_deaths NUMERIC(15, 2),     -- úmrtia pripisateľné alkoholu
-    UNIQUE(country_id, sex_id, age_group_id, year_id)
+    cirrhosis_deaths_lower NUMERIC(15, 2),   -- dolná hranica 95% UI (Monte Carlo)
+    cirrhosis_deaths_upper NUMERIC(15, 2),   -- horná hranica 95% UI (Monte Carlo)
+    attributable_deaths_lower NUMERIC(15, 2),
+    attributable_deaths_upper NUMERIC(15, 2),
+    load_generation_id INTEGER NOT NULL REFERENCES etl_load_generation(generation_id),
+    UNIQUE(load_generation_id, country_id, sex_id, age_group_id, year_id)
 );
 
 CREATE INDEX idx_alcohol_cirr_country ON fact_alcohol_cirrhosis(country_id);
 CREATE INDEX idx_alcohol_cirr_year ON fact_alcohol_cirrhosis(year_id);
+
+-- POPULÁCIA: Krajina × Pohlavie × Veková skupina × Rok (pre per-capita miery)
+DROP TABLE IF EXISTS fact_population CASCADE;
+CREATE TABLE fact_population (
+    fact_id SERIAL PRIMARY KEY,
+    country_id INTEGER NOT NULL REFERENCES dim_country(country_id),
+    sex_id INTEGER NOT NULL REFERENCES dim_sex(sex_id),
+    age_group_id INTEGER NOT NULL REFERENCES dim_age_group(age_group_id),
+    year_id INTEGER NOT NULL REFERENCES dim_year(year_id),
+    population NUMERIC(15, 0),              -- počet obyvateľov
+    load_generation_id INTEGER NOT NULL REFERENCES etl_load_generation(generation_id),
+    UNIQUE(load_generation_id, country_id, sex_id, age_group_id, year_id)
+);
+
+CREATE INDEX idx_population_country ON fact_population(country_id);
+CREATE INDEX idx_population_year ON fact_population(year_id);
+
+-- ============================================================
+-- VIEWS - ATTRIBUTABLE DEATHS PODĽA AF SCENÁRA
+-- ============================================================
+-- attributable = total × af tam, kde má scenár AF (DEU, SWE), inak priamy IHME odhad (USA, CHE).
+-- Total DEU/SWE nemá zdrojovú neistotu (hranice NULL), hranice attributable sú preto iba rozsah AF
+-- (total × af_lower, total × af_upper) - nie 95% interval neistoty ako Monte Carlo UI, ktoré má USA/CHE.
+-- Views vracajú iba publikovanú generáciu načítania (etl_load_generation.is_current).
+-- Filtrovať cez scenario_id / scenario_code alebo is_default:
+--   SELECT ... FROM v_smoking_lung_cancer WHERE scenario_code = 'BASELINE';
+
+CREATE OR REPLACE VIEW v_smoking_lung_cancer AS
+SELECT s.scenario_id, s.scenario_code, s.version, s.is_default,
+       f.country_id, f.sex_id, f.age_group_id, f.year_id,
+       f.lung_cancer_deaths, f.lung_cancer_deaths_lower, f.lung_cancer_deaths_upper,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths
+            ELSE f.lung_cancer_deaths * a.af END AS attributable_deaths,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths_lower
+            ELSE COALESCE(f.lung_cancer_deaths_lower, f.lung_cancer_deaths) * COALESCE(a.af_lower, a.af) END AS attributable_deaths_lower,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths_upper
+            ELSE COALESCE(f.lung_cancer_deaths_upper, f.lung_cancer_deaths) * COALESCE(a.af_upper, a.af) END AS attributable_deaths_upper
+FROM fact_smoking_lung_cancer f
+JOIN etl_load_generation g ON g.generation_id = f.load_generation_id AND g.is_current
+CROSS JOIN dim_af_scenario s
+LEFT JOIN af_assumption a
+       ON a.scenario_id = s.scenario_id AND a.fact_name = 'smoking_lung_cancer' AND a.country_id = f.country_id;
+
+CREATE OR REPLACE VIEW v_bmi_cardiovascular AS
+SELECT s.scenario_id, s.scenario_code, s.version, s.is_default,
+       f.country_id, f.sex_id, f.age_group_id, f.year_id,
+       f.cvd_deaths, f.cvd_deaths_lower, f.cvd_deaths_upper,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths
+            ELSE f.cvd_deaths * a.af END AS attributable_deaths,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths_lower
+            ELSE COALESCE(f.cvd_deaths_lower, f.cvd_deaths) * COALESCE(a.af_lower, a.af) END AS attributable_deaths_lower,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths_upper
+            ELSE COALESCE(f.cvd_deaths_upper, f.cvd_deaths) * COALESCE(a.af_upper, a.af) END AS attributable_deaths_upper
+FROM fact_bmi_cardiovascular f
+JOIN etl_load_generation g ON g.generation_id = f.load_generation_id AND g.is_current
+CROSS JOIN dim_af_scenario s
+LEFT JOIN af_assumption a
+       ON a.scenario_id = s.scenario_id AND a.fact_name = 'bmi_cardiovascular' AND a.country_id = f.country_id;
+
+CREATE OR REPLACE VIEW v_pollution_respiratory AS
+SELECT s.scenario_id, s.scenario_code, s.version, s.is_default,
+       f.country_id, f.sex_id, f.age_group_id, f.year_id,
+       f.respiratory_deaths, f.respiratory_deaths_lower, f.respiratory_deaths_upper,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths
+            ELSE f.respiratory_deaths * a.af END AS attributable_deaths,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths_lower
+            ELSE COALESCE(f.respiratory_deaths_lower, f.respiratory_deaths) * COALESCE(a.af_lower, a.af) END AS attributable_deaths_lower,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths_upper
+            ELSE COALESCE(f.respiratory_deaths_upper, f.respiratory_deaths) * COALESCE(a.af_upper, a.af) END AS attributable_deaths_upper
+FROM fact_pollution_respiratory f
+JOIN etl_load_generation g ON g.generation_id = f.load_generation_id AND g.is_current
+CROSS JOIN dim_af_scenario s
+LEFT JOIN af_assumption a
+       ON a.scenario_id = s.scenario_id AND a.fact_name = 'pollution_respiratory' AND a.country_id = f.country_id;
+
+CREATE OR REPLACE VIEW v_alcohol_cirrhosis AS
+SELECT s.scenario_id, s.scenario_code, s.version, s.is_default,
+       f.country_id, f.sex_id, f.age_group_id, f.year_id,
+       f.cirrhosis_deaths, f.cirrhosis_deaths_lower, f.cirrhosis_deaths_upper,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths
+            ELSE f.cirrhosis_deaths * a.af END AS attributable_deaths,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths_lower
+            ELSE COALESCE(f.cirrhosis_deaths_lower, f.cirrhosis_deaths) * COALESCE(a.af_lower, a.af) END AS attributable_deaths_lower,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths_upper
+            ELSE COALESCE(f.cirrhosis_deaths_upper, f.cirrhosis_deaths) * COALESCE(a.af_upper, a.af) END AS attributable_deaths_upper
+FROM fact_alcohol_cirrhosis f
+JOIN etl_load_generation g ON g.generation_id = f.load_generation_id AND g.is_current
+CROSS JOIN dim_af_scenario s
+LEFT JOIN af_assumption a
+       ON a.scenario_id = s.scenario_id AND a.fact_name = 'alcohol_cirrhosis' AND a.country_id = f.country_id;
+
+-- ============================================================
+-- MIERY NA 100 000 OBYVATEĽOV (predpočítané, obnovujú sa pri publikovaní generácie)
+-- ============================================================
+
+-- Miery per bunka: úmrtia / populácia × 100 000, per AF scenár.
+-- rate_basis = 'crude' pre krajiny s počtami úmrtí; 'sdr' tam, kde úmrtia vznikli prepočtom SDR × populácia
+-- (DEU) - death_rate je potom len vstupné SDR, nie hrubá miera.
+CREATE MATERIALIZED VIEW mv_death_rates AS
+WITH facts AS (
+    SELECT scenario_id, 'smoking_lung_cancer' AS fact_name, country_id, sex_id, age_group_id, year_id,
+           lung_cancer_deaths AS deaths, attributable_deaths
+    FROM v_smoking_lung_cancer
+    UNION ALL
+    SELECT scenario_id, 'bmi_cardiovascular', country_id, sex_id, age_group_id, year_id,
+           cvd_deaths, attributable_deaths
+    FROM v_bmi_cardiovascular
+    UNION ALL
+    SELECT scenario_id, 'pollution_respiratory', country_id, sex_id, age_group_id, year_id,
+           respiratory_deaths, attributable_deaths
+    FROM v_pollution_respiratory
+    UNION ALL
+    SELECT scenario_id, 'alcohol_cirrhosis', country_id, sex_id, age_group_id, year_id,
+           cirrhosis_deaths, attributable_deaths
+    FROM v_alcohol_cirrhosis
+)
+SELECT f.scenario_id, f.fact_name, f.country_id, f.sex_id, f.age_group_id, f.year_id,
+       f.deaths, f.attributable_deaths, p.population,
+       f.deaths / NULLIF(p.population, 0) * 100000 AS death_rate,
+       f.attributable_deaths / NULLIF(p.population, 0) * 100000 AS attributable_rate,
+       CASE WHEN c.death_basis = 'sdr' THEN 'sdr' ELSE 'crude' END AS rate_basis
+FROM facts f
+JOIN dim_country c ON c.country_id = f.country_id
+JOIN fact_population p
+  ON p.country_id = f.country_id AND p.sex_id = f.sex_id
+ AND p.age_group_id = f.age_group_id AND p.year_id = f.year_id
+JOIN etl_load_generation g ON g.generation_id = p.load_generation_id AND g.is_current;
+
+CREATE UNIQUE INDEX idx_mv_death_rates_cell
+    ON mv_death_rates(scenario_id, fact_name, country_id, year_id, sex_id, age_group_id);
+
+-- Vekovo štandardizované miery (WHO štandard) - iba ak má krajina úmrtia aj populáciu pre všetky 4 vekové pásma.
+-- Zatiaľ prázdne: populáciu má iba DEU a jej SDR fakty sú len pre 'ALL'; naplní sa až so zdrojom,
+-- ktorý má úmrtia aj populáciu po vekových pásmach.
+CREATE MATERIALIZED VIEW mv_age_standardized_rates AS
+SELECT r.scenario_id, r.fact_name, r.country_id, r.sex_id, r.year_id,
+       SUM(r.death_rate * a.std_population) / SUM(a.std_population) AS death_rate_std,
+       SUM(r.attributable_rate * a.std_population) / SUM(a.std_population) AS attributable_rate_std
+FROM mv_death_rates r
+JOIN dim_age_group a ON a.age_group_id = r.age_group_id
+WHERE a.std_population IS NOT NULL
+GROUP BY r.scenario_id, r.fact_name, r.country_id, r.sex_id, r.year_id
+HAVING COUNT(*) = (SELECT COUNT(*) FROM dim_age_group WHERE std_population IS NOT NULL);
+
+CREATE UNIQUE INDEX idx_mv_age_std_rates_cell
+    ON mv_age_standardized_rates(scenario_id, fact_name, country_id, year_id, sex_id);
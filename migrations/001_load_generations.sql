@@ -0,0 +1,366 @@
+-- Migrácia existujúceho warehouse (postgres_data volume z pôvodného init/schema.sql) na generácie načítania,
+-- AF scenáre, hranice neistoty a populáciu. init/schema.sql beží iba pri prvom štarte s prázdnym volume.
+-- Spustenie (idempotentné, v jednej transakcii):
+--   docker-compose exec -T postgres psql -U tassu_user -d tassu_db -v ON_ERROR_STOP=1 < migrations/001_load_generations.sql
+-- Existujúce fakty sa zachovajú ako publikovaná generácia.
+
+BEGIN;
+
+-- ============================================================
+-- DIMENSION TABLES
+-- ============================================================
+
+ALTER TABLE dim_country ADD COLUMN IF NOT EXISTS death_basis VARCHAR(10) NOT NULL DEFAULT 'count';
+UPDATE dim_country SET death_basis = 'sdr' WHERE country_code = 'DEU';
+
+ALTER TABLE dim_age_group ADD COLUMN IF NOT EXISTS std_population NUMERIC(10, 2);
+UPDATE dim_age_group a SET std_population = v.std_population
+FROM (VALUES ('0-14', 26150), ('15-49', 52010), ('50-69', 16600), ('70+', 5275))
+     AS v(age_group_code, std_population)
+WHERE a.age_group_code = v.age_group_code AND a.std_population IS NULL;
+
+CREATE TABLE IF NOT EXISTS dim_af_scenario (
+    scenario_id SERIAL PRIMARY KEY,
+    scenario_code VARCHAR(50) NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    description VARCHAR(255),
+    is_default BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at TIMESTAMP NOT NULL DEFAULT now(),
+    UNIQUE(scenario_code, version)
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_af_scenario_default ON dim_af_scenario(is_default) WHERE is_default;
+
+INSERT INTO dim_af_scenario (scenario_code, version, description, is_default)
+SELECT 'BASELINE', 1, 'DEU: RKI, GBD 2019; SWE: epidemiologická literatúra', NOT EXISTS (SELECT 1 FROM dim_af_scenario WHERE is_default)
+ON CONFLICT (scenario_code, version) DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS af_assumption (
+    scenario_id INTEGER NOT NULL REFERENCES dim_af_scenario(scenario_id) ON DELETE CASCADE,
+    fact_name VARCHAR(50) NOT NULL,
+    country_id INTEGER NOT NULL REFERENCES dim_country(country_id),
+    af NUMERIC(5, 4) NOT NULL CHECK (af BETWEEN 0 AND 1),
+    af_lower NUMERIC(5, 4),
+    af_upper NUMERIC(5, 4),
+    PRIMARY KEY (scenario_id, fact_name, country_id)
+);
+
+INSERT INTO af_assumption (scenario_id, fact_name, country_id, af, af_lower, af_upper)
+SELECT s.scenario_id, v.fact_name, c.country_id, v.af, v.af_lower, v.af_upper
+FROM (VALUES
+    ('DEU', 'smoking_lung_cancer', 0.80, 0.75, 0.85),
+    ('DEU', 'bmi_cardiovascular', 0.15, 0.10, 0.20),
+    ('DEU', 'pollution_respiratory', 0.20, 0.15, 0.25),
+    ('DEU', 'alcohol_cirrhosis', 0.48, 0.40, 0.56),
+    ('SWE', 'smoking_lung_cancer', 0.75, 0.70, 0.80),
+    ('SWE', 'bmi_cardiovascular', 0.15, 0.10, 0.20),
+    ('SWE', 'pollution_respiratory', 0.20, 0.15, 0.25),
+    ('SWE', 'alcohol_cirrhosis', 0.55, 0.50, 0.60)
+) AS v(country_code, fact_name, af, af_lower, af_upper)
+JOIN dim_country c ON c.country_code = v.country_code
+CROSS JOIN dim_af_scenario s
+WHERE s.scenario_code = 'BASELINE' AND s.version = 1
+ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION create_af_scenario(p_code VARCHAR, p_description VARCHAR, p_base_code VARCHAR DEFAULT 'BASELINE')
+RETURNS INTEGER AS $$
+DECLARE
+    base_id INTEGER;
+    new_id INTEGER;
+BEGIN
+    SELECT scenario_id INTO base_id FROM dim_af_scenario
+    WHERE scenario_code = p_base_code
+    ORDER BY version DESC LIMIT 1;
+
+    INSERT INTO dim_af_scenario (scenario_code, version, description)
+    SELECT p_code, COALESCE(MAX(version), 0) + 1, p_description
+    FROM dim_af_scenario WHERE scenario_code = p_code
+    RETURNING scenario_id INTO new_id;
+
+    INSERT INTO af_assumption (scenario_id, fact_name, country_id, af, af_lower, af_upper)
+    SELECT new_id, a.fact_name, a.country_id, a.af, a.af_lower, a.af_upper
+    FROM af_assumption a
+    WHERE a.scenario_id = base_id;
+    RETURN new_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================
+-- ETL - GENERÁCIE NAČÍTANIA A CHECKPOINTY
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS etl_load_generation (
+    generation_id SERIAL PRIMARY KEY,
+    status VARCHAR(20) NOT NULL DEFAULT 'loading',
+    is_current BOOLEAN NOT NULL DEFAULT FALSE,
+    started_at TIMESTAMP NOT NULL DEFAULT now(),
+    published_at TIMESTAMP
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_load_generation_current ON etl_load_generation(is_current) WHERE is_current;
+
+CREATE TABLE IF NOT EXISTS etl_checkpoint (
+    generation_id INTEGER NOT NULL REFERENCES etl_load_generation(generation_id) ON DELETE CASCADE,
+    source VARCHAR(3) NOT NULL,
+    fact_table VARCHAR(50) NOT NULL,
+    chunk_no INTEGER NOT NULL,
+    row_count INTEGER NOT NULL,
+    is_last BOOLEAN NOT NULL DEFAULT FALSE,
+    committed_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (generation_id, source, fact_table, chunk_no)
+);
+
+CREATE TABLE IF NOT EXISTS etl_staged (
+    generation_id INTEGER NOT NULL REFERENCES etl_load_generation(generation_id) ON DELETE CASCADE,
+    source VARCHAR(3) NOT NULL,
+    fact_table VARCHAR(50) NOT NULL,
+    staged_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (generation_id, source, fact_table)
+);
+
+CREATE TABLE IF NOT EXISTS etl_reject (
+    reject_id SERIAL PRIMARY KEY,
+    generation_id INTEGER NOT NULL REFERENCES etl_load_generation(generation_id) ON DELETE CASCADE,
+    source VARCHAR(3) NOT NULL,
+    fact_table VARCHAR(50) NOT NULL,
+    country_code VARCHAR(3),
+    sex_code VARCHAR(10),
+    age_group_code VARCHAR(20),
+    year VARCHAR(10),
+    total_deaths NUMERIC,
+    attributable_deaths NUMERIC,
+    reason VARCHAR(50) NOT NULL,
+    rejected_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_etl_reject_generation ON etl_reject(generation_id, fact_table);
+
+-- ============================================================
+-- FACT TABLES - HRANICE NEISTOTY A GENERÁCIA NAČÍTANIA
+-- ============================================================
+
+ALTER TABLE fact_smoking_lung_cancer
+    ADD COLUMN IF NOT EXISTS lung_cancer_deaths_lower NUMERIC(15, 2),
+    ADD COLUMN IF NOT EXISTS lung_cancer_deaths_upper NUMERIC(15, 2),
+    ADD COLUMN IF NOT EXISTS attributable_deaths_lower NUMERIC(15, 2),
+    ADD COLUMN IF NOT EXISTS attributable_deaths_upper NUMERIC(15, 2),
+    ADD COLUMN IF NOT EXISTS load_generation_id INTEGER REFERENCES etl_load_generation(generation_id);
+
+ALTER TABLE fact_bmi_cardiovascular
+    ADD COLUMN IF NOT EXISTS cvd_deaths_lower NUMERIC(15, 2),
+    ADD COLUMN IF NOT EXISTS cvd_deaths_upper NUMERIC(15, 2),
+    ADD COLUMN IF NOT EXISTS attributable_deaths_lower NUMERIC(15, 2),
+    ADD COLUMN IF NOT EXISTS attributable_deaths_upper NUMERIC(15, 2),
+    ADD COLUMN IF NOT EXISTS load_generation_id INTEGER REFERENCES etl_load_generation(generation_id);
+
+ALTER TABLE fact_pollution_respiratory
+    ADD COLUMN IF NOT EXISTS respiratory_deaths_lower NUMERIC(15, 2),
+    ADD COLUMN IF NOT EXISTS respiratory_deaths_upper NUMERIC(15, 2),
+    ADD COLUMN IF NOT EXISTS attributable_deaths_lower NUMERIC(15, 2),
+    ADD COLUMN IF NOT EXISTS attributable_deaths_upper NUMERIC(15, 2),
+    ADD COLUMN IF NOT EXISTS load_generation_id INTEGER REFERENCES etl_load_generation(generation_id);
+
+ALTER TABLE fact_alcohol_cirrhosis
+    ADD COLUMN IF NOT EXISTS cirrhosis_deaths_lower NUMERIC(15, 2),
+    ADD COLUMN IF NOT EXISTS cirrhosis_deaths_upper NUMERIC(15, 2),
+    ADD COLUMN IF NOT EXISTS attributable_deaths_lower NUMERIC(15, 2),
+    ADD COLUMN IF NOT EXISTS attributable_deaths_upper NUMERIC(15, 2),
+    ADD COLUMN IF NOT EXISTS load_generation_id INTEGER REFERENCES etl_load_generation(generation_id);
+
+CREATE TABLE IF NOT EXISTS fact_population (
+    fact_id SERIAL PRIMARY KEY,
+    country_id INTEGER NOT NULL REFERENCES dim_country(country_id),
+    sex_id INTEGER NOT NULL REFERENCES dim_sex(sex_id),
+    age_group_id INTEGER NOT NULL REFERENCES dim_age_group(age_group_id),
+    year_id INTEGER NOT NULL REFERENCES dim_year(year_id),
+    population NUMERIC(15, 0),
+    load_generation_id INTEGER NOT NULL REFERENCES etl_load_generation(generation_id),
+    UNIQUE(load_generation_id, country_id, sex_id, age_group_id, year_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_population_country ON fact_population(country_id);
+CREATE INDEX IF NOT EXISTS idx_population_year ON fact_population(year_id);
+
+-- Fakty načítané pred migráciou dostanú jednu publikovanú generáciu, aby ich views videli aj naďalej
+-- a unikátny kľúč platil per generácia
+DO $$
+DECLARE
+    fact_table TEXT;
+    legacy_id INTEGER;
+    has_legacy BOOLEAN;
+    old_key TEXT;
+BEGIN
+    FOREACH fact_table IN ARRAY ARRAY['fact_smoking_lung_cancer', 'fact_bmi_cardiovascular',
+                                      'fact_pollution_respiratory', 'fact_alcohol_cirrhosis'] LOOP
+        EXECUTE format('SELECT EXISTS (SELECT 1 FROM %I WHERE load_generation_id IS NULL)', fact_table) INTO has_legacy;
+        IF has_legacy THEN
+            IF legacy_id IS NULL THEN
+                SELECT generation_id INTO legacy_id FROM etl_load_generation WHERE is_current;
+            END IF;
+            IF legacy_id IS NULL THEN
+                INSERT INTO etl_load_generation (status, is_current, published_at)
+                VALUES ('published', TRUE, now())
+                RETURNING generation_id INTO legacy_id;
+            END IF;
+            EXECUTE format('UPDATE %I SET load_generation_id = $1 WHERE load_generation_id IS NULL', fact_table)
+            USING legacy_id;
+        END IF;
+        EXECUTE format('ALTER TABLE %I ALTER COLUMN load_generation_id SET NOT NULL', fact_table);
+
+        -- Pôvodný UNIQUE(country_id, sex_id, age_group_id, year_id) by blokoval ďalšiu generáciu
+        FOR old_key IN
+            SELECT c.conname FROM pg_constraint c
+            WHERE c.conrelid = fact_table::regclass AND c.contype = 'u'
+              AND NOT EXISTS (SELECT 1 FROM pg_attribute a
+                              WHERE a.attrelid = c.conrelid AND a.attnum = ANY (c.conkey)
+                                AND a.attname = 'load_generation_id')
+        LOOP
+            EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', fact_table, old_key);
+        END LOOP;
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint c
+                       JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = ANY (c.conkey)
+                       WHERE c.conrelid = fact_table::regclass AND c.contype = 'u'
+                         AND a.attname = 'load_generation_id') THEN
+            EXECUTE format('ALTER TABLE %I ADD UNIQUE (load_generation_id, country_id, sex_id, age_group_id, year_id)',
+                           fact_table);
+        END IF;
+    END LOOP;
+END;
+$$;
+
+-- Views a materializované views sa vytvoria nanovo (rovnako ako v init/schema.sql)
+DROP MATERIALIZED VIEW IF EXISTS mv_age_standardized_rates;
+DROP MATERIALIZED VIEW IF EXISTS mv_death_rates;
+DROP VIEW IF EXISTS v_smoking_lung_cancer, v_bmi_cardiovascular, v_pollution_respiratory, v_alcohol_cirrhosis;
+
+-- ============================================================
+-- VIEWS - ATTRIBUTABLE DEATHS PODĽA AF SCENÁRA
+-- ============================================================
+-- attributable = total × af tam, kde má scenár AF (DEU, SWE), inak priamy IHME odhad (USA, CHE).
+-- Total DEU/SWE nemá zdrojovú neistotu (hranice NULL), hranice attributable sú preto iba rozsah AF
+-- (total × af_lower, total × af_upper) - nie 95% interval neistoty ako Monte Carlo UI, ktoré má USA/CHE.
+-- Views vracajú iba publikovanú generáciu načítania (etl_load_generation.is_current).
+-- Filtrovať cez scenario_id / scenario_code alebo is_default:
+--   SELECT ... FROM v_smoking_lung_cancer WHERE scenario_code = 'BASELINE';
+
+CREATE OR REPLACE VIEW v_smoking_lung_cancer AS
+SELECT s.scenario_id, s.scenario_code, s.version, s.is_default,
+       f.country_id, f.sex_id, f.age_group_id, f.year_id,
+       f.lung_cancer_deaths, f.lung_cancer_deaths_lower, f.lung_cancer_deaths_upper,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths
+            ELSE f.lung_cancer_deaths * a.af END AS attributable_deaths,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths_lower
+            ELSE COALESCE(f.lung_cancer_deaths_lower, f.lung_cancer_deaths) * COALESCE(a.af_lower, a.af) END AS attributable_deaths_lower,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths_upper
+            ELSE COALESCE(f.lung_cancer_deaths_upper, f.lung_cancer_deaths) * COALESCE(a.af_upper, a.af) END AS attributable_deaths_upper
+FROM fact_smoking_lung_cancer f
+JOIN etl_load_generation g ON g.generation_id = f.load_generation_id AND g.is_current
+CROSS JOIN dim_af_scenario s
+LEFT JOIN af_assumption a
+       ON a.scenario_id = s.scenario_id AND a.fact_name = 'smoking_lung_cancer' AND a.country_id = f.country_id;
+
+CREATE OR REPLACE VIEW v_bmi_cardiovascular AS
+SELECT s.scenario_id, s.scenario_code, s.version, s.is_default,
+       f.country_id, f.sex_id, f.age_group_id, f.year_id,
+       f.cvd_deaths, f.cvd_deaths_lower, f.cvd_deaths_upper,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths
+            ELSE f.cvd_deaths * a.af END AS attributable_deaths,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths_lower
+            ELSE COALESCE(f.cvd_deaths_lower, f.cvd_deaths) * COALESCE(a.af_lower, a.af) END AS attributable_deaths_lower,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths_upper
+            ELSE COALESCE(f.cvd_deaths_upper, f.cvd_deaths) * COALESCE(a.af_upper, a.af) END AS attributable_deaths_upper
+FROM fact_bmi_cardiovascular f
+JOIN etl_load_generation g ON g.generation_id = f.load_generation_id AND g.is_current
+CROSS JOIN dim_af_scenario s
+LEFT JOIN af_assumption a
+       ON a.scenario_id = s.scenario_id AND a.fact_name = 'bmi_cardiovascular' AND a.country_id = f.country_id;
+
+CREATE OR REPLACE VIEW v_pollution_respiratory AS
+SELECT s.scenario_id, s.scenario_code, s.version, s.is_default,
+       f.country_id, f.sex_id, f.age_group_id, f.year_id,
+       f.respiratory_deaths, f.respiratory_deaths_lower, f.respiratory_deaths_upper,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths
+            ELSE f.respiratory_deaths * a.af END AS attributable_deaths,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths_lower
+            ELSE COALESCE(f.respiratory_deaths_lower, f.respiratory_deaths) * COALESCE(a.af_lower, a.af) END AS attributable_deaths_lower,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths_upper
+            ELSE COALESCE(f.respiratory_deaths_upper, f.respiratory_deaths) * COALESCE(a.af_upper, a.af) END AS attributable_deaths_upper
+FROM fact_pollution_respiratory f
+JOIN etl_load_generation g ON g.generation_id = f.load_generation_id AND g.is_current
+CROSS JOIN dim_af_scenario s
+LEFT JOIN af_assumption a
+       ON a.scenario_id = s.scenario_id AND a.fact_name = 'pollution_respiratory' AND a.country_id = f.country_id;
+
+CREATE OR REPLACE VIEW v_alcohol_cirrhosis AS
+SELECT s.scenario_id, s.scenario_code, s.version, s.is_default,
+       f.country_id, f.sex_id, f.age_group_id, f.year_id,
+       f.cirrhosis_deaths, f.cirrhosis_deaths_lower, f.cirrhosis_deaths_upper,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths
+            ELSE f.cirrhosis_deaths * a.af END AS attributable_deaths,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths_lower
+            ELSE COALESCE(f.cirrhosis_deaths_lower, f.cirrhosis_deaths) * COALESCE(a.af_lower, a.af) END AS attributable_deaths_lower,
+       CASE WHEN a.af IS NULL THEN f.attributable_deaths_upper
+            ELSE COALESCE(f.cirrhosis_deaths_upper, f.cirrhosis_deaths) * COALESCE(a.af_upper, a.af) END AS attributable_deaths_upper
+FROM fact_alcohol_cirrhosis f
+JOIN etl_load_generation g ON g.generation_id = f.load_generation_id AND g.is_current
+CROSS JOIN dim_af_scenario s
+LEFT JOIN af_assumption a
+       ON a.scenario_id = s.scenario_id AND a.fact_name = 'alcohol_cirrhosis' AND a.country_id = f.country_id;
+
+-- ============================================================
+-- MIERY NA 100 000 OBYVATEĽOV (predpočítané, obnovujú sa pri publikovaní generácie)
+-- ============================================================
+
+-- Miery per bunka: úmrtia / populácia × 100 000, per AF scenár.
+-- rate_basis = 'crude' pre krajiny s počtami úmrtí; 'sdr' tam, kde úmrtia vznikli prepočtom SDR × populácia
+-- (DEU) - death_rate je potom len vstupné SDR, nie hrubá miera.
+CREATE MATERIALIZED VIEW mv_death_rates AS
+WITH facts AS (
+    SELECT scenario_id, 'smoking_lung_cancer' AS fact_name, country_id, sex_id, age_group_id, year_id,
+           lung_cancer_deaths AS deaths, attributable_deaths
+    FROM v_smoking_lung_cancer
+    UNION ALL
+    SELECT scenario_id, 'bmi_cardiovascular', country_id, sex_id, age_group_id, year_id,
+           cvd_deaths, attributable_deaths
+    FROM v_bmi_cardiovascular
+    UNION ALL
+    SELECT scenario_id, 'pollution_respiratory', country_id, sex_id, age_group_id, year_id,
+           respiratory_deaths, attributable_deaths
+    FROM v_pollution_respiratory
+    UNION ALL
+    SELECT scenario_id, 'alcohol_cirrhosis', country_id, sex_id, age_group_id, year_id,
+           cirrhosis_deaths, attributable_deaths
+    FROM v_alcohol_cirrhosis
+)
+SELECT f.scenario_id, f.fact_name, f.country_id, f.sex_id, f.age_group_id, f.year_id,
+       f.deaths, f.attributable_deaths, p.population,
+       f.deaths / NULLIF(p.population, 0) * 100000 AS death_rate,
+       f.attributable_deaths / NULLIF(p.population, 0) * 100000 AS attributable_rate,
+       CASE WHEN c.death_basis = 'sdr' THEN 'sdr' ELSE 'crude' END AS rate_basis
+FROM facts f
+JOIN dim_country c ON c.country_id = f.country_id
+JOIN fact_population p
+  ON p.country_id = f.country_id AND p.sex_id = f.sex_id
+ AND p.age_group_id = f.age_group_id AND p.year_id = f.year_id
+JOIN etl_load_generation g ON g.generation_id = p.load_generation_id AND g.is_current;
+
+CREATE UNIQUE INDEX idx_mv_death_rates_cell
+    ON mv_death_rates(scenario_id, fact_name, country_id, year_id, sex_id, age_group_id);
+
+-- Vekovo štandardizované miery (WHO štandard) - iba ak má krajina úmrtia aj populáciu pre všetky 4 vekové pásma.
+-- Zatiaľ prázdne: populáciu má iba DEU a jej SDR fakty sú len pre 'ALL'; naplní sa až so zdrojom,
+-- ktorý má úmrtia aj populáciu po vekových pásmach.
+CREATE MATERIALIZED VIEW mv_age_standardized_rates AS
+SELECT r.scenario_id, r.fact_name, r.country_id, r.sex_id, r.year_id,
+       SUM(r.death_rate * a.std_population) / SUM(a.std_population) AS death_rate_std,
+       SUM(r.attributable_rate * a.std_population) / SUM(a.std_population) AS attributable_rate_std
+FROM mv_death_rates r
+JOIN dim_age_group a ON a.age_group_id = r.age_group_id
+WHERE a.std_population IS NOT NULL
+GROUP BY r.scenario_id, r.fact_name, r.country_id, r.sex_id, r.year_id
+HAVING COUNT(*) = (SELECT COUNT(*) FROM dim_age_group WHERE std_population IS NOT NULL);
+
+CREATE UNIQUE INDEX idx_mv_age_std_rates_cell
+    ON mv_age_standardized_rates(scenario_id, fact_name, country_id, year_id, sex_id);
+
+COMMIT;
@@ -1,36 +1,37 @@
 -- Comprehensive verification query for 2013-2023 data
 -- Uses UNION ALL to avoid cartesian product from multiple LEFT JOINs
+-- Reads the published load generation through the v_* views (default AF scenario)
 
 WITH smoking_data AS (
   SELECT c.country_name, y.year, SUM(f.lung_cancer_deaths) AS value
-  FROM fact_smoking_lung_cancer f
+  FROM v_smoking_lung_cancer f
   JOIN dim_country c ON f.country_id = c.country_id
   JOIN dim_year y ON f.year_id = y.year_id
-  WHERE c.country_code IN ('DEU', 'SWE', 'CHE', 'USA')
+  WHERE c.country_code IN ('DEU', 'SWE', 'CHE', 'USA') AND f.is_default
   GROUP BY c.country_name, y.year
 ),
 bmi_data AS (
   SELECT c.country_name, y.year, SUM(f.cvd_deaths) AS value
-  FROM fact_bmi_cardiovascular f
+  FROM v_bmi_cardiovascular f
   JOIN dim_country c ON f.country_id = c.country_id
   JOIN dim_year y ON f.year_id = y.year_id
-  WHERE c.country_code IN ('DEU', 'SWE', 'CHE', 'USA')
+  WHERE c.country_code IN ('DEU', 'SWE', 'CHE', 'USA') AND f.is_default
   GROUP BY c.country_name, y.year
 ),
 pollution_data AS (
   SELECT c.country_name, y.year, SUM(f.respiratory_deaths) AS value
-  FROM fact_pollution_respiratory f
+  FROM v_pollution_respiratory f
   JOIN dim_country c ON f.country_id = c.country_id
   JOIN dim_year y ON f.year_id = y.year_id
-  WHERE c.country_code IN ('DEU', 'SWE', 'CHE', 'USA')
+  WHERE c.country_code IN ('DEU', 'SWE', 'CHE', 'USA') AND f.is_default
   GROUP BY c.country_name, y.year
 ),
 alcohol_data AS (
   SELECT c.country_name, y.year, SUM(f.cirrhosis_deaths) AS value
-  FROM fact_alcohol_cirrhosis f
+  FROM v_alcohol_cirrhosis f
   JOIN dim_country c ON f.country_id = c.country_id
   JOIN dim_year y ON f.year_id = y.year_id
-  WHERE c.country_code IN ('DEU', 'SWE', 'CHE', 'USA')
+  WHERE c.country_code IN ('DEU', 'SWE', 'CHE', 'USA') AND f.is_default
   GROUP BY c.country_name, y.year
 )
 SELECT 